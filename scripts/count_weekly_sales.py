@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
-from collections import defaultdict
+import numpy as np
+from sales_cube import get_sales_cube
 
 TRANSACTIONS_DIR = Path("transactions")
 
@@ -8,39 +8,33 @@ def analyze_product_sales(start_week: int = 0, end_week: int = 4):
     """
     Analyze sales per product across weeks and find each product's best week.
     """
-    # Structure: {product: {week: amount}}
-    product_weekly_sales = defaultdict(lambda: defaultdict(int))
-    
+    cube = get_sales_cube()
+    weeks = []
     for week in range(start_week, end_week + 1):
-        file_transactions = TRANSACTIONS_DIR / f"transactions_{week}.json"
-        
-        try:
-            with open(file_transactions, "r") as f:
-                transactions = json.load(f)
-        except FileNotFoundError:
+        if not cube.has_week(week):
             print(f"Warning: transactions_{week}.json not found, skipping...")
             continue
-        
-        # Sum up sales per product for this week
-        for trans_list in transactions.values():
-            for t in trans_list:
-                merch_types = t.get("merch_types", [])
-                merch_amounts = t.get("merch_amounts", [])
-                
-                for product, amount in zip(merch_types, merch_amounts):
-                    product_weekly_sales[product][week] += amount
+        weeks.append(week)
+
+    # weeks × products slice of the cube; weeks where a product never appeared can't be its best week
+    rows = [cube.week_index[w] for w in weeks]
+    weekly_totals = cube.week_product_totals()[rows]
+    appeared = cube.product_rank[rows] >= 0
+    ranked = np.where(appeared, weekly_totals, -1)
+    best_rows = ranked.argmax(axis=0) if weeks else None
     
     # Analyze each product
     print("Product Sales Analysis")
     print("=" * 80)
     
-    for product in sorted(product_weekly_sales.keys()):
-        weekly_data = product_weekly_sales[product]
-        total_sold = sum(weekly_data.values())
+    sold_products = [p for p in range(len(cube.products)) if weeks and appeared[:, p].any()]
+    for p in sorted(sold_products, key=lambda p: cube.products[p]):
+        product = cube.products[p]
+        total_sold = int(weekly_totals[:, p].sum())
         
         # Find best week
-        best_week = max(weekly_data, key=weekly_data.get)
-        best_week_amount = weekly_data[best_week]
+        best_week = weeks[best_rows[p]]
+        best_week_amount = int(weekly_totals[best_rows[p], p])
         
         print(f"{product} - total sold: {total_sold} - most sold week: week {best_week} - most sold: {best_week_amount}")
     
@@ -1,13 +1,23 @@
-from pathlib import Path
-from dash import Dash, dcc, html, Input, Output
-import plotly.graph_objects as go
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dash import Dash, dcc, html, Input, Output, Patch, State, no_update
+from dash.exceptions import PreventUpdate
+from plotly.utils import PlotlyJSONEncoder
+import fast_figure as ff
 
 # ---------------------------------------------------------------------
 # Imports from refactored scripts
 # ---------------------------------------------------------------------
+from dataset import available_weeks, dataset_version
+from file_watcher import DataWatcher
+from week_aggregate import get_week_aggregate
 from net_loss import generate_total_profit_figure
 from potential_sales import generate_potential_net_profit_timeseries
 from salesvolume import generate_total_sales_volume_timeseries
+from timeseries_total import generate_daily_sales_figure
 from stock_visual import generate_stock_visual_figure
 from salesrate import generate_salesrate_figure
 from revenue_per_product import generate_revenue_per_product_figure
@@ -20,15 +30,111 @@ from worker_product_sales import (
 )
 
 # ---------------------------------------------------------------------
-# File locations
+# Data files
 # ---------------------------------------------------------------------
-TRANSACTIONS_DIR = Path("transactions")
+AVAILABLE_WEEKS = available_weeks("transactions")
 
-AVAILABLE_WEEKS = sorted([
-    int(p.stem.split("_")[1])
-    for p in TRANSACTIONS_DIR.glob("transactions_*.json")
-    if p.stem.split("_")[1].isdigit()
-])
+# Input files are re-scanned every DASHBOARD_POLL_SECONDS to pick up new or changed weeks
+POLL_INTERVAL_MS = int(float(os.environ.get("DASHBOARD_POLL_SECONDS", "5")) * 1000)
+watcher = DataWatcher()
+
+
+def week_options(weeks):
+    return [{"label": f"Week {w}", "value": w} for w in weeks]
+
+
+def week_marks(weeks):
+    return {w: str(w) for w in weeks}
+
+
+def week_bounds(weeks):
+    return (weeks[0], weeks[-1]) if weeks else (0, 0)
+
+# Weekly figures are built concurrently on a shared, bounded pool
+FIGURE_WORKERS = int(os.environ.get("DASHBOARD_FIGURE_WORKERS", "4"))
+FIGURE_TIMEOUT_S = float(os.environ.get("DASHBOARD_FIGURE_TIMEOUT", "10"))
+figure_pool = ThreadPoolExecutor(max_workers=FIGURE_WORKERS, thread_name_prefix="figures")
+
+
+def error_figure(message):
+    """Placeholder shown in place of a graph that failed to build."""
+    return ff.empty_figure(
+        title=f"⚠️ {message}",
+        template_name="plotly_white",
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+    )
+
+
+def build_figures(builders, timeout=FIGURE_TIMEOUT_S):
+    """
+    Run {name: zero-argument figure function} concurrently and return the figures
+    in the same order. A builder that raises or misses the shared deadline is
+    replaced by an error placeholder; the others are unaffected.
+    """
+    futures = {name: figure_pool.submit(builder) for name, builder in builders.items()}
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    figures = []
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            print(f"Warning: {name} figure timed out after {timeout:g}s")
+            figures.append(error_figure(f"{name} took too long to build"))
+        elif future.exception() is not None:
+            print(f"Warning: {name} figure failed: {future.exception()!r}")
+            figures.append(error_figure(f"Could not build {name} figure"))
+        else:
+            figures.append(future.result())
+    return figures
+
+
+def figure_shape(fig):
+    """Hash of a figure without its trace data and title; figures with equal shapes can be patched."""
+    layout = {k: v for k, v in fig["layout"].items() if k != "title"}
+    key = json.dumps([[trace.get("type") for trace in fig["data"]], layout], sort_keys=True, cls=PlotlyJSONEncoder)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _assign_traces_and_title(patched, fig):
+    patched["data"] = fig["data"]
+    patched["layout"]["title"] = fig["layout"].get("title")
+
+
+def patch_figure(fig, shown_shape):
+    """(update, shape) for a graph: a Patch of traces and title if the shape is unchanged, else the figure."""
+    shape = figure_shape(fig)
+    if shape != shown_shape:
+        return fig, shape
+    patched = Patch()
+    _assign_traces_and_title(patched, fig)
+    return patched, shape
+
+
+def patch_figure_store(figures, shown_shapes):
+    """(update, shapes) for a store of {name: figure}, patched only if every figure kept its shape."""
+    shapes = {name: figure_shape(fig) for name, fig in figures.items()}
+    if shapes != shown_shapes:
+        return figures, shapes
+    patched = Patch()
+    for name, fig in figures.items():
+        _assign_traces_and_title(patched[name], fig)
+    return patched, shapes
+
+
+def load_aggregate(week):
+    """
+    The week's WeekAggregate, or None if its transactions file is missing or unreadable.
+    With None each generator loads the week itself: a missing file gives its empty
+    state, an unreadable one fails inside build_figures and shows an error placeholder.
+    """
+    try:
+        return get_week_aggregate(week)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read transactions for week {week}: {e!r}")
+        return None
 
 # ---------------------------------------------------------------------
 # Dash app
@@ -39,12 +145,12 @@ app.title = "Sales Dashboard"
 # ---------------------------------------------------------------------
 # Helper: reusable chart container
 # ---------------------------------------------------------------------
-def make_graph_card(title, figure_func, height=500, min_width="700px"):
-    """Reusable HTML block with title and figure"""
+def make_graph_card(title, graph_id, height=500, min_width="700px"):
+    """Reusable HTML block with title and an initially empty figure"""
     return html.Div(
         [
             html.H3(title, style={"textAlign": "center"}),
-            dcc.Graph(figure=figure_func(), style={"height": f"{height}px"}),
+            dcc.Loading(dcc.Graph(id=graph_id, figure=ff.empty_figure(), style={"height": f"{height}px"})),
         ],
         style={"flex": "1", "padding": "20px", "minWidth": min_width},
     )
@@ -52,12 +158,30 @@ def make_graph_card(title, figure_func, height=500, min_width="700px"):
 # ---------------------------------------------------------------------
 # Graph definitions for Total tab
 # ---------------------------------------------------------------------
+# Each builder takes the selected (start_week, end_week); range sums come from the week index
 TOTAL_GRAPHS = [
-    ("Weekly & Cumulative Net Profit/Loss", generate_total_profit_figure),
-    ("Total & Cumulative Sales Volume + Stock", lambda: generate_total_sales_volume_timeseries(0, 7)),
-    ("Potential Sales Value (If All Stock Sold)", generate_potential_net_profit_timeseries),
+    ("total-profit-graph", "Weekly & Cumulative Net Profit/Loss",
+     lambda start, end: generate_total_profit_figure(start_week=start, end_week=end)),
+    ("total-salesvolume-graph", "Total & Cumulative Sales Volume + Stock",
+     lambda start, end: generate_total_sales_volume_timeseries(start, end)),
+    ("total-potential-graph", "Potential Sales Value (If All Stock Sold)",
+     lambda start, end: generate_potential_net_profit_timeseries(start_week=start, end_week=end)),
 ]
 
+# Total tab figures are built on first view and kept until an input file or the week range changes
+_total_lock = threading.Lock()
+_total_cache = {"version": None, "figures": None}
+
+
+def get_total_figures(start_week=None, end_week=None):
+    """Return (version key, figures) for the Total tab, rebuilding only when the dataset version or range changes."""
+    version = hashlib.sha1(repr((dataset_version(), start_week, end_week)).encode()).hexdigest()
+    with _total_lock:
+        if _total_cache["version"] != version:
+            _total_cache["figures"] = [func(start_week, end_week) for _, _, func in TOTAL_GRAPHS]
+            _total_cache["version"] = version
+        return version, _total_cache["figures"]
+
 # ---------------------------------------------------------------------
 # Layout
 # ---------------------------------------------------------------------
@@ -65,6 +189,9 @@ app.layout = html.Div(
     [
         html.H1("Sales Dashboard", style={"textAlign": "center", "margin": "20px"}),
 
+        dcc.Interval(id="data-poll", interval=POLL_INTERVAL_MS),
+        dcc.Store(id="data-generation", data=0),
+
         dcc.Tabs(
             id="tabs",
             value="weekly",
@@ -87,7 +214,7 @@ app.layout = html.Div(
                         html.Label("Select Week:", style={"marginRight": "10px", "fontWeight": "bold"}),
                         dcc.Dropdown(
                             id="week-dropdown",
-                            options=[{"label": f"Week {w}", "value": w} for w in AVAILABLE_WEEKS],
+                            options=week_options(AVAILABLE_WEEKS),
                             value=AVAILABLE_WEEKS[0] if AVAILABLE_WEEKS else None,
                             clearable=False,
                             style={"width": "200px"},
@@ -131,6 +258,8 @@ app.layout = html.Div(
                                     clearable=False,
                                     style={"marginBottom": "10px"},
                                 ),
+                                dcc.Store(id="pie-store"),
+                                dcc.Store(id="weekly-shapes"),
                                 dcc.Graph(id="pie-graph", style={"height": "400px"}),
                             ],
                             style={"flex": "1", "padding": "10px"},
@@ -158,7 +287,7 @@ app.layout = html.Div(
                                         html.Label("Select Week:", style={"marginRight": "10px", "fontWeight": "bold"}),
                                         dcc.Dropdown(
                                             id="worker-week-dropdown",
-                                            options=[{"label": f"Week {w}", "value": w} for w in AVAILABLE_WEEKS],
+                                            options=week_options(AVAILABLE_WEEKS),
                                             value=AVAILABLE_WEEKS[0] if AVAILABLE_WEEKS else None,
                                             clearable=False,
                                             style={"width": "180px", "marginRight": "20px"},
@@ -177,6 +306,31 @@ app.layout = html.Div(
                                     ],
                                     style={"display": "flex", "alignItems": "center", "marginBottom": "10px"},
                                 ),
+                                html.Div(
+                                    [
+                                        html.Label("Receipts Containing:", style={"marginRight": "10px", "fontWeight": "bold"}),
+                                        dcc.Dropdown(
+                                            id="basket-product-dropdown",
+                                            options=[],
+                                            value=[],
+                                            multi=True,
+                                            placeholder="Any receipt",
+                                            style={"width": "400px", "marginRight": "20px"},
+                                        ),
+                                        dcc.RadioItems(
+                                            id="basket-match",
+                                            options=[
+                                                {"label": "Any of them", "value": "any"},
+                                                {"label": "All of them", "value": "all"},
+                                            ],
+                                            value="any",
+                                            inline=True,
+                                        ),
+                                    ],
+                                    style={"display": "flex", "alignItems": "center", "marginBottom": "10px"},
+                                ),
+                                dcc.Store(id="worker-product-store"),
+                                dcc.Store(id="worker-product-shapes"),
                                 dcc.Graph(id="worker-product-graph", style={"height": "500px"}),
                             ],
                             style={"flex": "1", "padding": "10px", "minWidth": "800px"},
@@ -188,14 +342,41 @@ app.layout = html.Div(
         ),
 
         # -----------------------------------------------------------------
-        # TOTAL TAB (Auto-generated)
+        # TOTAL TAB (filled in by update_total_graphs when opened)
         # -----------------------------------------------------------------
         html.Div(
             id="total-tab",
             style={"display": "none", "fontFamily": "Arial, sans-serif", "maxWidth": "2000px", "margin": "0 auto"},
             children=[
+                dcc.Store(id="total-version"),
+                dcc.Store(id="total-daily-view"),
+                dcc.Store(id="total-daily-key"),
                 html.Div(
-                    [make_graph_card(title, func) for title, func in TOTAL_GRAPHS],
+                    [
+                        html.Label("Weeks:", style={"marginRight": "10px", "fontWeight": "bold"}),
+                        html.Div(
+                            dcc.RangeSlider(
+                                id="total-week-range",
+                                min=week_bounds(AVAILABLE_WEEKS)[0],
+                                max=week_bounds(AVAILABLE_WEEKS)[1],
+                                step=1,
+                                value=list(week_bounds(AVAILABLE_WEEKS)),
+                                marks=week_marks(AVAILABLE_WEEKS),
+                                allowCross=False,
+                            ),
+                            style={"width": "600px"},
+                        ),
+                    ],
+                    style={
+                        "display": "flex",
+                        "justifyContent": "center",
+                        "alignItems": "center",
+                        "margin": "20px",
+                    },
+                ),
+                html.Div(
+                    [make_graph_card(title, graph_id) for graph_id, title, _ in TOTAL_GRAPHS]
+                    + [make_graph_card("Daily Sales per Product", "total-daily-graph", min_width="100%")],
                     style={
                         "display": "flex",
                         "flexWrap": "wrap",
@@ -223,12 +404,144 @@ def switch_tab(selected_tab):
     else:
         return {"display": "none"}, {"display": "block"}
 
+# ---------------------------------------------------------------------
+# Data reload callback: refresh week lists when input files change
+# ---------------------------------------------------------------------
+@app.callback(
+    Output("week-dropdown", "options"),
+    Output("week-dropdown", "value"),
+    Output("worker-week-dropdown", "options"),
+    Output("worker-week-dropdown", "value"),
+    Output("total-week-range", "min"),
+    Output("total-week-range", "max"),
+    Output("total-week-range", "marks"),
+    Output("total-week-range", "value"),
+    Output("data-generation", "data"),
+    Input("data-poll", "n_intervals"),
+    State("week-dropdown", "value"),
+    State("worker-week-dropdown", "value"),
+    State("total-week-range", "value"),
+    State("total-week-range", "max"),
+    State("data-generation", "data"),
+)
+def refresh_weeks(_n_intervals, selected_week, selected_worker_week, selected_range, shown_max, shown_generation):
+    watcher.poll()
+    if watcher.generation == shown_generation:
+        raise PreventUpdate
+
+    weeks = available_weeks("transactions")
+    options = week_options(weeks)
+
+    def keep(value):
+        # Only touch the selection if its week disappeared, so graphs are not redrawn needlessly
+        if value in weeks:
+            return no_update
+        return weeks[0] if weeks else None
+
+    first, last = week_bounds(weeks)
+
+    def keep_range(value):
+        # A range that reached the last week keeps following it as new weeks arrive
+        start, end = value or (first, last)
+        if end >= shown_max:
+            end = last
+        start = min(max(start, first), last)
+        end = min(max(end, start), last)
+        return no_update if [start, end] == value else [start, end]
+
+    return (
+        options, keep(selected_week), options, keep(selected_worker_week),
+        first, last, week_marks(weeks), keep_range(selected_range),
+        watcher.generation,
+    )
+
+# ---------------------------------------------------------------------
+# Total tab graphs callback
+# ---------------------------------------------------------------------
+@app.callback(
+    [Output(graph_id, "figure") for graph_id, _, _ in TOTAL_GRAPHS],
+    Output("total-version", "data"),
+    Input("tabs", "value"),
+    Input("total-week-range", "value"),
+    Input("data-generation", "data"),
+    State("total-version", "data"),
+)
+def update_total_graphs(selected_tab, week_range, _generation, shown_version):
+    if selected_tab != "total":
+        raise PreventUpdate
+
+    start_week, end_week = week_range or (None, None)
+    version, figures = get_total_figures(start_week, end_week)
+    if version == shown_version:
+        # The browser already shows these figures
+        return [no_update] * len(TOTAL_GRAPHS), no_update
+    return figures, version
+
+# ---------------------------------------------------------------------
+# Daily sales graph: downsampled to the plot width, refined on zoom
+# ---------------------------------------------------------------------
+# The browser reports the visible x range and plot width; pan/zoom events that
+# leave both unchanged (and y-only zooms) do not reach the server
+app.clientside_callback(
+    """
+    function(relayout, tab, current) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (tab !== "total") {
+            return noUpdate;
+        }
+        var view = {range: current ? current.range : null, width: null};
+        var graph = document.getElementById("total-daily-graph");
+        var plot = graph && graph.querySelector(".js-plotly-plot");
+        if (plot && plot._fullLayout && plot._fullLayout._size.w > 0) {
+            view.width = Math.round(plot._fullLayout._size.w);
+        }
+        if (relayout) {
+            if (relayout["xaxis.autorange"]) {
+                view.range = null;
+            } else if ("xaxis.range[0]" in relayout) {
+                view.range = [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]];
+            } else if (relayout["xaxis.range"]) {
+                view.range = relayout["xaxis.range"];
+            }
+        }
+        if (current && JSON.stringify(view) === JSON.stringify(current)) {
+            return noUpdate;
+        }
+        return view;
+    }
+    """,
+    Output("total-daily-view", "data"),
+    Input("total-daily-graph", "relayoutData"),
+    Input("tabs", "value"),
+    State("total-daily-view", "data"),
+)
+
+
+@app.callback(
+    Output("total-daily-graph", "figure"),
+    Output("total-daily-key", "data"),
+    Input("total-daily-view", "data"),
+    Input("tabs", "value"),
+    Input("data-generation", "data"),
+    State("total-daily-key", "data"),
+)
+def update_daily_sales_graph(view, selected_tab, _generation, shown_key):
+    if selected_tab != "total":
+        raise PreventUpdate
+
+    view = view or {}
+    key = hashlib.sha1(repr((dataset_version(), view.get("range"), view.get("width"))).encode()).hexdigest()
+    if key == shown_key:
+        return no_update, no_update
+    return generate_daily_sales_figure(view.get("range"), view.get("width")), key
+
 # ---------------------------------------------------------------------
 # Worker dropdown callback
 # ---------------------------------------------------------------------
 @app.callback(
     Output("worker-dropdown", "options"),
     Output("worker-dropdown", "value"),
+    Output("basket-product-dropdown", "options"),
     Input("worker-week-dropdown", "value")
 )
 def update_worker_dropdown(selected_week):
@@ -245,7 +558,15 @@ def update_worker_dropdown(selected_week):
             options.append({"label": name, "value": worker_id})
 
     options[1:] = sorted(options[1:], key=lambda x: x["label"])
-    return options, "all"
+
+    return options, "all", basket_product_options(selected_week)
+
+
+def basket_product_options(week):
+    """Receipt-filter options: the week's products, or none if its transactions are missing or unreadable."""
+    aggregate = load_aggregate(week) if week is not None else None
+    products = sorted(aggregate.products) if aggregate is not None else []
+    return [{"label": name, "value": name} for name in products]
 
 # ---------------------------------------------------------------------
 # Weekly tab graphs callback
@@ -254,53 +575,113 @@ def update_worker_dropdown(selected_week):
     Output("stock-graph", "figure"),
     Output("profit-graph", "figure"),
     Output("salesrate-graph", "figure"),
-    Output("pie-graph", "figure"),
+    Output("pie-store", "data"),
+    Output("weekly-shapes", "data"),
     Input("week-dropdown", "value"),
-    Input("pie-view-dropdown", "value")
+    Input("data-generation", "data"),
+    State("weekly-shapes", "data")
 )
-def update_weekly_graphs(selected_week, pie_view):
+def update_weekly_graphs(selected_week, _generation, shown_shapes):
     if selected_week is None:
-        empty_fig = go.Figure()
-        return empty_fig, empty_fig, empty_fig, empty_fig
+        empty_fig = ff.empty_figure()
+        return empty_fig, empty_fig, empty_fig, {"profit": empty_fig, "loss": empty_fig}, None
 
-    fig_stock = generate_stock_visual_figure(selected_week)
-    fig_profitbar = generate_revenue_per_product_figure(selected_week)
-    fig_salesrate = generate_salesrate_figure(selected_week)
+    # One pass over the week's transactions, shared by all four charts
+    aggregate = load_aggregate(selected_week)
 
-    fig_profit_pie, fig_loss_pie = generate_profit_loss_pie_figures(selected_week)
+    def build_pies():
+        fig_profit_pie, fig_loss_pie = generate_profit_loss_pie_figures(selected_week, aggregate)
+        return {"profit": fig_profit_pie, "loss": fig_loss_pie}
 
-    if pie_view == "profit":
-        fig_pie = fig_profit_pie
-    elif pie_view == "loss":
-        fig_pie = fig_loss_pie
-    else:
-        fig_pie = go.Figure()
-        for trace in fig_profit_pie.data:
-            fig_pie.add_trace(trace)
-        for trace in fig_loss_pie.data:
-            fig_pie.add_trace(trace)
-        fig_pie.update_layout(title="Gross Profit & Loss", showlegend=True)
+    fig_stock, fig_profitbar, fig_salesrate, pies = build_figures({
+        "stock": lambda: generate_stock_visual_figure(selected_week, aggregate),
+        "profit per product": lambda: generate_revenue_per_product_figure(selected_week, aggregate),
+        "sales rate": lambda: generate_salesrate_figure(selected_week, aggregate),
+        "profit/loss pie": build_pies,
+    })
+    if "profit" not in pies:
+        # Failed pie (figures are dicts too, so check for the pie keys): send the placeholder whole and force full figures next time
+        return fig_stock, fig_profitbar, fig_salesrate, {"error": pies}, None
+
+    # Switching between weeks with the same products only changes traces and titles
+    shown_shapes = shown_shapes or {}
+    updates, shapes = [], {}
+    for name, fig in (("stock", fig_stock), ("profit", fig_profitbar), ("salesrate", fig_salesrate)):
+        update, shapes[name] = patch_figure(fig, shown_shapes.get(name))
+        updates.append(update)
+    pie_update, shapes["pies"] = patch_figure_store(pies, shown_shapes.get("pies"))
 
-    return fig_stock, fig_profitbar, fig_salesrate, fig_pie
+    return (*updates, pie_update, shapes)
+
+# Pie view switching only re-renders the pie, in the browser, from the stored pies
+app.clientside_callback(
+    """
+    function(view, pies) {
+        if (!pies) {
+            return {data: [], layout: {}};
+        }
+        if (pies.error) {
+            return pies.error;
+        }
+        if (view === "profit" || view === "loss") {
+            return pies[view];
+        }
+        return {
+            data: pies.profit.data.concat(pies.loss.data),
+            layout: {title: {text: "Gross Profit & Loss"}, showlegend: true},
+        };
+    }
+    """,
+    Output("pie-graph", "figure"),
+    Input("pie-view-dropdown", "value"),
+    Input("pie-store", "data"),
+)
 
 # ---------------------------------------------------------------------
 # Worker product graph callback
 # ---------------------------------------------------------------------
 @app.callback(
-    Output("worker-product-graph", "figure"),
+    Output("worker-product-store", "data"),
+    Output("worker-product-shapes", "data"),
     Input("worker-week-dropdown", "value"),
     Input("worker-dropdown", "value"),
-    Input("worker-chart-type-dropdown", "value")
+    Input("basket-product-dropdown", "value"),
+    Input("basket-match", "value"),
+    Input("data-generation", "data"),
+    State("worker-product-shapes", "data")
 )
-def update_worker_product_graph(selected_week, selected_worker, chart_type):
+def update_worker_product_graph(selected_week, selected_worker, basket, match, _generation, shown_shapes):
+    """
+    Build both chart types for the worker; the chart-type toggle then switches in the browser.
+    Switching worker usually only changes bar values and titles, so that is all that is sent.
+    basket / match restrict the charts to receipts containing any or all of those products.
+    """
     if selected_week is None:
-        return go.Figure()
+        empty_fig = ff.empty_figure()
+        return {"bar": empty_fig, "pie": empty_fig}, None
 
     worker_id = None if selected_worker == "all" else selected_worker
+    aggregate = load_aggregate(selected_week)
+
+    fig_bar, fig_pie = build_figures({
+        "worker product bar": lambda: generate_worker_product_sales_figure(selected_week, worker_id, aggregate, basket, match),
+        "worker product pie": lambda: generate_worker_product_pie_figure(selected_week, worker_id, aggregate, basket, match),
+    })
+    return patch_figure_store({"bar": fig_bar, "pie": fig_pie}, shown_shapes)
 
-    if chart_type == "pie":
-        return generate_worker_product_pie_figure(selected_week, worker_id)
-    return generate_worker_product_sales_figure(selected_week, worker_id)
+app.clientside_callback(
+    """
+    function(chartType, figures) {
+        if (!figures) {
+            return {data: [], layout: {}};
+        }
+        return chartType === "pie" ? figures.pie : figures.bar;
+    }
+    """,
+    Output("worker-product-graph", "figure"),
+    Input("worker-chart-type-dropdown", "value"),
+    Input("worker-product-store", "data"),
+)
 
 # ---------------------------------------------------------------------
 # Run app
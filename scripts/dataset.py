@@ -0,0 +1,59 @@
+# dataset.py
+"""Locations of the input files, week discovery and dataset versions."""
+from pathlib import Path
+from file_cache import file_signature
+
+TRANSACTIONS_DIR = Path("transactions")
+AMOUNTS_DIR = Path("amounts")
+PRICES_DIR = Path("prices")
+SCHEDULES_DIR = Path("schedules")
+SUPPLIER_FILE = Path("supplier_prices.json")
+WORKERS_FILE = Path("workers/workers.jsonl")
+
+WEEKLY_FOLDERS = {
+    "transactions": TRANSACTIONS_DIR,
+    "amounts": AMOUNTS_DIR,
+    "prices": PRICES_DIR,
+    "schedules": SCHEDULES_DIR,
+}
+
+
+def available_weeks(kind: str = "transactions"):
+    """Sorted week numbers that have a <kind>_<week>.json file."""
+    folder = WEEKLY_FOLDERS[kind]
+    return sorted(
+        int(p.stem.split("_")[1])
+        for p in folder.glob(f"{kind}_*.json")
+        if p.stem.split("_")[1].isdigit()
+    )
+
+
+def weekly_file(kind: str, week_number: int) -> Path:
+    return WEEKLY_FOLDERS[kind] / f"{kind}_{week_number}.json"
+
+
+def input_files(kinds=("transactions", "amounts", "prices", "schedules"), shared=True):
+    """All input files of the given weekly kinds, plus supplier prices and workers."""
+    files = []
+    for kind in kinds:
+        files.extend(weekly_file(kind, w) for w in available_weeks(kind))
+    if shared:
+        files.extend([SUPPLIER_FILE, WORKERS_FILE])
+    return files
+
+
+def dataset_version(paths=None):
+    """
+    Hashable version of a set of input files: (path, mtime_ns, size) per file,
+    with None for files that do not exist. Changes whenever any file is added,
+    removed or modified.
+    """
+    if paths is None:
+        paths = input_files()
+    version = []
+    for path in paths:
+        try:
+            version.append((str(path), file_signature(path)))
+        except FileNotFoundError:
+            version.append((str(path), None))
+    return tuple(version)
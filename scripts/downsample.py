@@ -0,0 +1,58 @@
+# downsample.py
+"""
+Point reduction for long time series.
+
+Both functions return sorted indices into the input, always keeping the first
+and last point, so the result can be used to slice x, y and any labels.
+    minmax_indices: min and max of each bucket; keeps every spike, cheap.
+    lttb_indices:   Largest-Triangle-Three-Buckets; keeps the visual shape
+                    with one point per bucket.
+"""
+import numpy as np
+
+
+def minmax_indices(y, n_out: int):
+    """About n_out indices: the first, the last, and the min and max of each bucket in between."""
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    positions = np.arange(1, n - 1)
+    bucket = (positions - 1) * n_buckets // (n - 2)
+
+    # Sort by bucket, then value: each bucket's run starts at its min and ends at its max
+    order = np.lexsort((y[positions], bucket))
+    first = np.flatnonzero(np.diff(bucket[order], prepend=-1))
+    last = np.append(first[1:] - 1, len(order) - 1)
+
+    keep = np.concatenate(([0], positions[order[first]], positions[order[last]], [n - 1]))
+    return np.unique(keep)
+
+
+def lttb_indices(x, y, n_out: int):
+    """n_out indices chosen with Largest-Triangle-Three-Buckets."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average of the next bucket (or the last point) is the third triangle corner
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        if next_end <= next_start:
+            next_start, next_end = n - 1, n
+        cx, cy = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
@@ -1,8 +1,10 @@
 import json
 import glob
 import os
-import re
 from collections import defaultdict
+from file_cache import cached
+from schedule_index import parse_schedule
+from worker_registry import get_worker_registry
 
 
 # --- Helpers ---
@@ -12,32 +14,8 @@ def load_json(path):
 
 
 def load_jsonl(path):
-    workers = {}
-    with open(path, "r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-            try:
-                entry = json.loads(line)
-                workers[entry["worker_id"]] = entry
-            except json.JSONDecodeError as e:
-                # Try fixing common issues: comma as decimal separator
-                try:
-                    # Pattern: finds numbers with commas like 5833,6282857143
-                    fixed_line = re.sub(r'(\d+),(\d+)', r'\1.\2', line)
-                    entry = json.loads(fixed_line)
-                    workers[entry["worker_id"]] = entry
-                    print(f"ℹ️ Fixed decimal separator in line {line_num}")
-                except:
-                    print(f"⚠️ Error parsing line {line_num} in {path}: {e}")
-                    char_pos = e.pos if hasattr(e, 'pos') else 104
-                    start = max(0, char_pos - 50)
-                    end = min(len(line), char_pos + 50)
-                    print(f"   Context around error (char {char_pos}):")
-                    print(f"   ...{line[start:end]}...")
-                    continue
-    return workers
+    """Map worker_id -> worker entry (decimal commas repaired by the registry)."""
+    return get_worker_registry(path).records_by_id()
 
 
 def calculate_worker_sales(transactions, week_num):
@@ -71,13 +49,8 @@ def calculate_worker_sales(transactions, week_num):
 
 
 def get_day_workers(schedule):
-    """Return mapping of day -> list of worker_ids (registers only)."""
-    workers_per_day = {}
-    for day, shifts in schedule.items():
-        # Filter to 'registers' dept only
-        registers = [s["worker_id"] for s in shifts if s["department"] == "registers"]
-        workers_per_day[day.lower()] = registers
-    return workers_per_day
+    """Return mapping of day -> set of worker_ids (registers only) for a WeekSchedule."""
+    return {day: schedule.workers_on("registers", day) for day in schedule.days}
 
 
 def analyze_cashier_performance():
@@ -100,7 +73,7 @@ def analyze_cashier_performance():
             continue
 
         transactions = load_json(tfile)
-        schedule = load_json(schedule_path)
+        schedule = cached(schedule_path, parse_schedule)
 
         worker_sales = calculate_worker_sales(transactions, week_num)
         workers_per_day = get_day_workers(schedule)
@@ -12,7 +12,8 @@ Example:
 import sys
 import json
 from pathlib import Path
-from collections import defaultdict
+from schedule_index import load_week_schedule
+from worker_registry import get_worker_registry
 
 WORKERS_FILE = Path("workers/workers.jsonl")
 SCHEDULES_DIR = Path("schedules")
@@ -20,35 +21,24 @@ SCHEDULES_DIR = Path("schedules")
 
 def load_workers():
     """Load worker data from JSONL file and return a dict mapping worker_id to worker info."""
-    workers = {}
     try:
-        with open(WORKERS_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    worker_data = json.loads(line)
-                    workers[worker_data["worker_id"]] = {
-                        "name": worker_data.get("name", "Unknown"),
-                        "salary": worker_data["salary"]
-                    }
-                except json.JSONDecodeError:
-                    continue
+        registry = get_worker_registry(WORKERS_FILE)
     except FileNotFoundError:
         print(f"Error: Workers file not found: {WORKERS_FILE}")
         sys.exit(1)
-    
-    return workers
+
+    return {
+        worker_id: {"name": registry.name(worker_id, "Unknown"), "salary": registry.salary(worker_id)}
+        for worker_id in registry.ids
+    }
 
 
 def get_scheduled_workers(week_number: int):
-    """Get list of worker IDs scheduled for the given week."""
+    """Get set of worker IDs scheduled for the given week and their shift counts."""
     schedule_file = SCHEDULES_DIR / f"schedules_{week_number}.json"
     
     try:
-        with open(schedule_file, "r") as f:
-            schedule = json.load(f)
+        schedule = load_week_schedule(week_number)
     except FileNotFoundError:
         print(f"Error: Schedule file not found: {schedule_file}")
         sys.exit(1)
@@ -56,18 +46,7 @@ def get_scheduled_workers(week_number: int):
         print(f"Error: Invalid JSON in schedule file: {schedule_file}")
         sys.exit(1)
     
-    # Collect unique workers scheduled this week
-    scheduled_workers = set()
-    shifts_per_worker = defaultdict(int)
-    
-    for day, day_schedule in schedule.items():
-        for shift in day_schedule:
-            if "worker_id" in shift:
-                worker_id = shift["worker_id"]
-                scheduled_workers.add(worker_id)
-                shifts_per_worker[worker_id] += 1
-    
-    return scheduled_workers, shifts_per_worker
+    return schedule.workers_on(), schedule.shift_counts()
 
 
 def calculate_weekly_salaries(week_number: int):
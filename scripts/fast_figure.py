@@ -0,0 +1,108 @@
+# fast_figure.py
+"""
+Plain-dict figure building for the dashboard.
+
+plotly.graph_objects validates every property as it is assigned, which costs
+more than the data work for most of our charts. The helpers here build the same
+JSON that go.Figure(...).to_plotly_json() produces, without validation, and
+Dash renders it identically. Named templates are expanded once per process and
+shared between figures, so figure dicts must be treated as read-only.
+
+Run this module to validate every dashboard figure against the plotly schema.
+"""
+import plotly.io as pio
+
+_templates = {}
+
+
+def template(name=None):
+    """Expanded template dict for name (plotly's default template if None)."""
+    name = name or pio.templates.default
+    if name not in _templates:
+        _templates[name] = pio.templates[name].to_plotly_json()
+    return _templates[name]
+
+
+def text(value):
+    """Title object; plotly.js only accepts titles as {"text": ...}."""
+    return {"text": value}
+
+
+def axis(title=None, **props):
+    """Axis layout dict with an optional title."""
+    if title is not None:
+        props["title"] = text(title)
+    return props
+
+
+def figure(data=(), title=None, template_name=None, **layout):
+    """Figure dict with the template expanded and an optional title."""
+    if title is not None:
+        layout["title"] = text(title)
+    layout["template"] = template(template_name)
+    return {"data": list(data), "layout": layout}
+
+
+def scatter(**props):
+    return {"type": "scatter", **props}
+
+
+def bar(**props):
+    return {"type": "bar", **props}
+
+
+def pie(**props):
+    return {"type": "pie", **props}
+
+
+def empty_figure(title=None, template_name=None, **layout):
+    """Figure without traces; with no arguments the equivalent of go.Figure()."""
+    return figure(title=title, template_name=template_name, **layout)
+
+
+if __name__ == "__main__":
+    # Self-check: build every dashboard figure and let plotly validate it
+    import plotly.graph_objects as go
+    from dataset import available_weeks
+    from net_loss import generate_total_profit_figure
+    from potential_sales import generate_potential_net_profit_timeseries
+    from profit_loss_pie import generate_profit_loss_pie_figures
+    from revenue_per_product import generate_revenue_per_product_figure
+    from salesrate import generate_salesrate_figure
+    from salesvolume import generate_total_sales_volume_timeseries
+    from stock_visual import generate_stock_visual_figure
+    from timeseries_total import generate_daily_sales_figure
+    from worker_product_sales import generate_worker_product_pie_figure, generate_worker_product_sales_figure
+
+    weeks = available_weeks("transactions")
+    figures = {
+        "total profit": generate_total_profit_figure(),
+        "potential": generate_potential_net_profit_timeseries(),
+        "sales volume": generate_total_sales_volume_timeseries(0, 7),
+        "sales volume (range)": generate_total_sales_volume_timeseries(2, 5),
+        "total profit (range)": generate_total_profit_figure(start_week=2, end_week=5),
+        "potential (range)": generate_potential_net_profit_timeseries(start_week=2, end_week=5),
+        "daily sales": generate_daily_sales_figure(),
+        "daily sales (downsampled)": generate_daily_sales_figure([5, 40], width_px=20),
+    }
+    for week in weeks + [max(weeks, default=0) + 1]:  # one missing week for the empty states
+        figures[f"stock {week}"] = generate_stock_visual_figure(week)
+        figures[f"salesrate {week}"] = generate_salesrate_figure(week)
+        figures[f"revenue {week}"] = generate_revenue_per_product_figure(week)
+        figures[f"profit pie {week}"], figures[f"loss pie {week}"] = generate_profit_loss_pie_figures(week)
+        figures[f"worker bar {week}"] = generate_worker_product_sales_figure(week)
+        figures[f"worker pie {week}"] = generate_worker_product_pie_figure(week)
+        figures[f"worker bar (basket) {week}"] = generate_worker_product_sales_figure(week, basket=["ice_cream"])
+        figures[f"worker pie (basket, all) {week}"] = generate_worker_product_pie_figure(
+            week, basket=["ice_cream", "sunscreen"], match="all"
+        )
+
+    failed = 0
+    for name, fig in figures.items():
+        try:
+            go.Figure(fig)
+        except ValueError as e:
+            failed += 1
+            print(f"❌ {name}: {e}")
+    print(f"Validated {len(figures)} figures, {failed} failed")
+    raise SystemExit(1 if failed else 0)
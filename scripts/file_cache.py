@@ -0,0 +1,147 @@
+# file_cache.py
+"""
+Process-wide cache of parsed input files.
+
+Entries are keyed on (path, loader) and stamped with the file's mtime and size,
+so a file that changed on disk is re-read on the next access. The cache holds
+at most DASHBOARD_CACHE_MB megabytes of source data (measured as size on disk)
+and evicts the least recently used entries beyond that.
+
+Cached values are shared between callers and must be treated as read-only.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_BUDGET_MB = float(os.environ.get("DASHBOARD_CACHE_MB", "256"))
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (path, loader) -> (signature, value, cost)
+_budget_bytes = int(DEFAULT_BUDGET_MB * 1024 * 1024)
+_used_bytes = 0
+
+
+def file_signature(path):
+    """Return (mtime_ns, size) for path. Raises FileNotFoundError if it is missing."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def set_budget(megabytes: float):
+    """Change the memory budget and evict down to it immediately."""
+    global _budget_bytes
+    with _lock:
+        _budget_bytes = int(megabytes * 1024 * 1024)
+        _evict()
+
+
+def clear():
+    """Drop every cached entry."""
+    global _used_bytes
+    with _lock:
+        _entries.clear()
+        _used_bytes = 0
+
+
+def invalidate(path):
+    """Drop all cached entries for one file, whatever loader produced them."""
+    global _used_bytes
+    path = str(Path(path))
+    with _lock:
+        for key in [k for k in _entries if k[0] == path]:
+            _used_bytes -= _entries.pop(key)[2]
+
+
+def stats():
+    """Return a dict with entry count, bytes used and the budget."""
+    with _lock:
+        return {"entries": len(_entries), "used_bytes": _used_bytes, "budget_bytes": _budget_bytes}
+
+
+def _evict():
+    global _used_bytes
+    while _used_bytes > _budget_bytes and _entries:
+        _, (_, _, cost) = _entries.popitem(last=False)
+        _used_bytes -= cost
+
+
+def peek(path, loader):
+    """Return the cached loader(path) if it is still fresh, else None. Never calls loader."""
+    key = (str(Path(path)), loader)
+    try:
+        signature = file_signature(path)
+    except FileNotFoundError:
+        return None
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == signature:
+            _entries.move_to_end(key)
+            return entry[1]
+    return None
+
+
+def cached(path, loader):
+    """
+    Return loader(path), reusing the previous result while the file's mtime and
+    size are unchanged. Raises FileNotFoundError if the file does not exist.
+    """
+    key = (str(Path(path)), loader)
+    signature = file_signature(path)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == signature:
+            _entries.move_to_end(key)
+            return entry[1]
+
+    value = loader(path)
+    _put(key, signature, value)
+    return value
+
+
+def store(path, loader, value, signature):
+    """
+    Cache a value that loader(path) produced elsewhere (e.g. in a worker process)
+    while the file had the given signature. Ignored if the file has changed since.
+    """
+    try:
+        if file_signature(path) != signature:
+            return
+    except FileNotFoundError:
+        return
+    _put((str(Path(path)), loader), signature, value)
+
+
+def _put(key, signature, value):
+    global _used_bytes
+    cost = signature[1]
+    with _lock:
+        old = _entries.pop(key, None)
+        if old is not None:
+            _used_bytes -= old[2]
+        if cost <= _budget_bytes:
+            _entries[key] = (signature, value, cost)
+            _used_bytes += cost
+            _evict()
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_json(path):
+    """Cached json.load of path."""
+    return cached(path, _read_json)
+
+
+def load_lines(path):
+    """Cached list of the stripped, non-empty lines of a text file (e.g. JSONL)."""
+    return cached(path, _read_lines)
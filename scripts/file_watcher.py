@@ -0,0 +1,64 @@
+# file_watcher.py
+"""
+Polling watcher for the dashboard's input files.
+
+poll() stats every input file (new weekly files are picked up through the
+folder globs in dataset.input_files), compares the result with the previous
+stat snapshot and returns the paths that appeared, changed or disappeared.
+Only those paths are dropped from file_cache. Derived caches (sales cube,
+ledger, Total tab figures) are keyed on the versions of the files they read,
+so they rebuild only when one of their own inputs is among the changes.
+"""
+import threading
+from dataset import dataset_version
+from file_cache import invalidate
+
+
+class DataWatcher:
+    """Stat-snapshot watcher. generation increases by one for every poll that saw changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = dict(dataset_version())
+        self.generation = 0
+
+    def poll(self):
+        """Return the set of input paths that changed since the last poll."""
+        with self._lock:
+            snapshot = dict(dataset_version())
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            for path in changed:
+                invalidate(path)
+            if changed:
+                self.generation += 1
+            self._snapshot = snapshot
+            return changed
+
+    def start(self, interval: float = 5.0, on_change=None):
+        """Poll every `interval` seconds on a daemon thread, calling on_change(paths) after changes."""
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                changed = self.poll()
+                if changed and on_change is not None:
+                    on_change(changed)
+
+        threading.Thread(target=run, name="data-watcher", daemon=True).start()
+        return stop
+
+
+if __name__ == "__main__":
+    import time
+
+    watcher = DataWatcher()
+    print("Watching input files, Ctrl+C to stop")
+    watcher.start(1.0, lambda paths: print(f"Changed: {', '.join(sorted(paths))}"))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
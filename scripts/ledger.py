@@ -0,0 +1,149 @@
+# ledger.py
+"""
+Weekly profit & loss ledger shared by every total-view script.
+
+For each transactions_<week>.json the ledger computes, as weeks × products
+matrices reduced with dot products:
+    revenue = sold units × retail price     (only products in that week's stock)
+    cogs    = stock units × supplier price
+    salary  = scheduled-workers mask · salary vector (see schedule_index)
+    net     = revenue - cogs - salary
+Weeks with a missing transactions/prices/amounts file have a net of 0.
+Retail and supplier prices come from the shared price timeline.
+The ledger is memoized on the versions of all input files.
+"""
+import threading
+import numpy as np
+from dataset import TRANSACTIONS_DIR, WORKERS_FILE, available_weeks, dataset_version, weekly_file
+from file_cache import load_json
+from price_timeline import get_price_timeline
+from schedule_index import weekly_salary_costs
+from transaction_store import WeekLines, load_week_lines
+from transaction_stream import stream_sold_totals
+from week_executor import map_weeks
+from worker_registry import WorkerRegistry, get_worker_registry
+
+_lock = threading.Lock()
+_ledgers = {}  # streaming flag -> (version, WeeklyLedger)
+
+
+def load_workers() -> WorkerRegistry:
+    """Worker registry, or an empty one (no salary costs) if the workers file is missing."""
+    try:
+        return get_worker_registry(WORKERS_FILE)
+    except FileNotFoundError:
+        print(f"Warning: Workers file not found: {WORKERS_FILE}")
+        return WorkerRegistry([])
+
+
+def load_sold_totals(week_number: int, streaming: bool = False):
+    """Units sold per product for a week, either from the transaction store or streamed."""
+    if streaming:
+        return stream_sold_totals(TRANSACTIONS_DIR / f"transactions_{week_number}.json")
+    return load_week_lines(week_number).totals_by_name()
+
+
+def week_sold_totals(lines: WeekLines) -> dict:
+    """Per-week partial for map_weeks: units sold per product name."""
+    return lines.totals_by_name()
+
+
+class WeeklyLedger:
+    """Per-week P&L vectors plus the weeks × products matrices they come from."""
+
+    def __init__(self, weeks, products, available, sold, prices, stock, stocked, supplier, salary):
+        self.weeks = weeks
+        self.products = products
+        self.available = available
+        self.sold = sold
+        self.prices = prices
+        self.stock = stock
+        self.stocked = stocked
+        self.supplier = supplier
+
+        # Only products listed in the week's stock file count towards revenue
+        self.revenue = np.einsum("wp,wp->w", sold * stocked, prices)
+        self.cogs = stock @ supplier
+        self.potential_sales = np.einsum("wp,wp->w", stock, prices)
+        self.salary = np.where(available, salary, 0.0)
+        self.net = np.where(available, self.revenue - self.cogs - self.salary, 0.0)
+        self.cumulative = np.cumsum(self.net)
+
+    def rows(self):
+        """List of (week, net, cumulative) tuples."""
+        return list(zip(self.weeks, self.net.tolist(), self.cumulative.tolist()))
+
+
+def build_ledger(streaming: bool = False, max_workers=None) -> WeeklyLedger:
+    """
+    Build the ledger. Unless streaming, weeks are decoded in parallel with up to
+    max_workers processes (see week_executor).
+    """
+    weeks = available_weeks("transactions")
+    timeline = get_price_timeline()
+
+    if streaming:
+        # Streaming keeps one week in memory at a time, so it stays sequential
+        week_sold = [None] * len(weeks)
+    else:
+        week_sold = map_weeks(week_sold_totals, weeks, max_workers)
+
+    week_inputs = []
+    products = {}
+    for week, sold_totals in zip(weeks, week_sold):
+        try:
+            if not timeline.has_week(week):
+                raise FileNotFoundError(weekly_file("prices", week))
+            if sold_totals is None:
+                sold_totals = load_sold_totals(week, streaming)
+            stock_data = load_json(weekly_file("amounts", week))
+        except FileNotFoundError:
+            week_inputs.append(None)
+            continue
+        for merch in stock_data:
+            products.setdefault(merch, len(products))
+        week_inputs.append((sold_totals, stock_data))
+
+    n_weeks, n_products = len(weeks), len(products)
+    available = np.zeros(n_weeks, dtype=bool)
+    sold = np.zeros((n_weeks, n_products))
+    stock = np.zeros((n_weeks, n_products))
+    stocked = np.zeros((n_weeks, n_products), dtype=bool)
+    salary = weekly_salary_costs(weeks, load_workers())
+
+    for w, inputs in enumerate(week_inputs):
+        if inputs is None:
+            continue
+        sold_totals, stock_data = inputs
+        available[w] = True
+        for merch, stock_amount in stock_data.items():
+            p = products[merch]
+            stocked[w, p] = True
+            stock[w, p] = stock_amount
+            sold[w, p] = sold_totals.get(merch, 0)
+
+    # Retail prices only for the products stocked in a week with its own prices file
+    prices = np.where(stocked, timeline.matrix_for(weeks, products), 0.0)
+    supplier = timeline.supplier_vector(products)
+    return WeeklyLedger(weeks, list(products), available, sold, prices, stock, stocked, supplier, salary)
+
+
+def get_ledger(streaming: bool = False, max_workers=None) -> WeeklyLedger:
+    """Return the ledger for the current input files, rebuilding it when any of them changes."""
+    version = dataset_version()
+    with _lock:
+        cached = _ledgers.get(streaming)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        ledger = build_ledger(streaming, max_workers)
+        _ledgers[streaming] = (version, ledger)
+        return ledger
+
+
+if __name__ == "__main__":
+    ledger = get_ledger()
+    print(f"{'Week':<6} {'Revenue':>14} {'COGS':>14} {'Salary':>12} {'Net':>14}")
+    print("-" * 64)
+    for w, week in enumerate(ledger.weeks):
+        print(f"{week:<6} {ledger.revenue[w]:>14,.2f} {ledger.cogs[w]:>14,.2f} "
+              f"{ledger.salary[w]:>12,.2f} {ledger.net[w]:>14,.2f}")
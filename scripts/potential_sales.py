@@ -2,124 +2,96 @@
 import json
 from collections import defaultdict
 from pathlib import Path
+import numpy as np
 import plotly.graph_objects as go
+import fast_figure as ff
+from file_cache import load_json
+from price_timeline import PriceTimeline, get_price_timeline
+from schedule_index import weekly_salary_costs
+from week_executor import thread_map
+from worker_registry import WorkerRegistry, get_worker_registry
 
 AMOUNTS_DIR = Path("amounts")
-PRICES_DIR = Path("prices")
-SUPPLIER_FILE = Path("supplier_prices.json")
 WORKERS_FILE = Path("workers/workers.jsonl")
-SCHEDULES_DIR = Path("schedules")
 
 
-def load_workers():
-    """Load worker data and return dict mapping worker_id to salary."""
-    workers = {}
+def load_workers() -> WorkerRegistry:
+    """Worker registry, or an empty one (no salary costs) if the workers file is missing."""
     try:
-        with open(WORKERS_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    worker_data = json.loads(line)
-                    workers[worker_data["worker_id"]] = worker_data["salary"]
-                except json.JSONDecodeError:
-                    continue
+        return get_worker_registry(WORKERS_FILE)
     except FileNotFoundError:
         print(f"Warning: Workers file not found: {WORKERS_FILE}")
-    return workers
+        return WorkerRegistry([])
 
 
-def get_weekly_salary_cost(week_number: int, workers: dict):
-    """Calculate total weekly salary cost for workers scheduled that week."""
-    file_schedule = SCHEDULES_DIR / f"schedules_{week_number}.json"
-    total_salary = 0
-    try:
-        with open(file_schedule, "r") as f:
-            schedule = json.load(f)
-
-        scheduled_workers = set()
-        for day_schedule in schedule.values():
-            for shift in day_schedule:
-                if "worker_id" in shift:
-                    scheduled_workers.add(shift["worker_id"])
-
-        for worker_id in scheduled_workers:
-            total_salary += workers.get(worker_id, 0)
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
-
-    return total_salary
-
-
-def calculate_potential_net_profit_for_week(week_num: int, workers: dict, supplier_prices: dict) -> float:
+def calculate_potential_net_profit_for_week(week_num: int, weekly_salary_cost: float, timeline: PriceTimeline) -> float:
     """Calculate potential net profit if all stock is sold at retail price."""
     amounts_file = AMOUNTS_DIR / f"amounts_{week_num}.json"
-    prices_file = PRICES_DIR / f"prices_{week_num}.json"
 
-    if not amounts_file.exists() or not prices_file.exists():
+    if not amounts_file.exists() or not timeline.has_week(week_num):
         return 0.0
 
     try:
-        with open(amounts_file, "r") as f:
-            stock_data = json.load(f)
-        with open(prices_file, "r") as f:
-            price_data = json.load(f)
+        stock_data = load_json(amounts_file)
     except json.JSONDecodeError:
         return 0.0
 
-    potential_profit = 0.0
-    for merch, stock_amount in stock_data.items():
-        sell_price = price_data.get(merch, 0)
-        buy_price = supplier_prices.get(merch, 0)
-        potential_profit += stock_amount * (sell_price - buy_price)
+    products = list(stock_data)
+    stock = np.array(list(stock_data.values()), dtype=float)
+    margin = timeline.vector(week_num, products) - timeline.supplier_vector(products)
+    potential_profit = float(stock @ margin)
 
     # Subtract weekly salary costs
-    weekly_salary_cost = get_weekly_salary_cost(week_num, workers)
     net_profit = potential_profit - weekly_salary_cost
 
     return net_profit
 
 
-def generate_potential_net_profit_timeseries():
-    """Generate Plotly line chart showing potential net profit per week."""
-    if not SUPPLIER_FILE.exists():
-        return go.Figure()
-
-    with open(SUPPLIER_FILE) as f:
-        supplier_prices = json.load(f)
-
-    workers = load_workers()
+def generate_potential_net_profit_timeseries(max_workers=None, start_week=None, end_week=None):
+    """
+    Generate Plotly line chart showing potential net profit per week in [start_week, end_week]
+    (None = open end), reading weeks on up to max_workers threads.
+    """
+    timeline = get_price_timeline()
+    if not timeline.supplier_available:
+        return ff.empty_figure()
 
     weeks = sorted(
         int(p.stem.split("_")[1])
         for p in AMOUNTS_DIR.glob("amounts_*.json")
         if p.stem.split("_")[1].isdigit()
     )
+    weeks = [
+        w for w in weeks
+        if (start_week is None or w >= start_week) and (end_week is None or w <= end_week)
+    ]
+    salary_costs = dict(zip(weeks, weekly_salary_costs(weeks, load_workers()).tolist()))
+
+    potential_profits = thread_map(
+        lambda w: calculate_potential_net_profit_for_week(w, salary_costs[w], timeline),
+        weeks,
+        max_workers,
+    )
 
-    potential_profits = [calculate_potential_net_profit_for_week(w, workers, supplier_prices) for w in weeks]
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    trace = ff.scatter(
         x=weeks,
         y=potential_profits,
         mode="lines+markers",
         name="Potential Net Profit (All Stock Sold)",
         line=dict(color="green", width=3, dash="dot"),
         marker=dict(size=8)
-    ))
+    )
 
-    fig.update_layout(
+    return ff.figure(
+        [trace],
         title="Potential Net Profit (If All Stock Sold)",
-        xaxis_title="Week Number",
-        yaxis_title="Potential Net Profit (kr)",
-        template="plotly_white",
+        xaxis=ff.axis("Week Number"),
+        yaxis=ff.axis("Potential Net Profit (kr)"),
+        template_name="plotly_white",
         legend=dict(x=0.02, y=0.98)
     )
 
-    return fig
-
 
 if __name__ == "__main__":
     fig = generate_potential_net_profit_timeseries()
-    fig.show()
+    go.Figure(fig).show()
@@ -0,0 +1,170 @@
+# price_timeline.py
+"""
+Retail price timeline (weeks × products) plus supplier prices, built once.
+
+Every prices_<week>.json is read in numeric week order (so prices_10 comes
+after prices_2) into a matrix with one row per week that has a prices file.
+Missing entries are forward-filled from the product's previous price, so each
+row is the price "as of" that week:
+    price_at("Cola", 5)        price of Cola in week 5, or the last one before it
+    vector(5, names)           as-of prices for a list of products, as an array
+    latest()                   last known price per product
+Products that were never priced up to a week get the default (0). The
+timeline is rebuilt when a prices file or the supplier file changes.
+"""
+import threading
+import numpy as np
+from dataset import PRICES_DIR, SUPPLIER_FILE, dataset_version, input_files
+from file_cache import load_json
+
+_lock = threading.Lock()
+_timeline = None
+_timeline_version = None
+
+
+def _numeric_prices(data) -> dict:
+    """product -> float for the entries of a prices file that are numbers."""
+    prices = {}
+    if not isinstance(data, dict):
+        return prices
+    for product, price in data.items():
+        try:
+            prices[str(product)] = float(price)
+        except (TypeError, ValueError):
+            pass
+    return prices
+
+
+class PriceTimeline:
+    """
+    weeks: weeks with a readable prices file, ascending. products: every priced product.
+    matrix[i, p]: as-of retail price of products[p] in weeks[i] (NaN before its first price).
+    observed[i, p]: True where weeks[i]'s file lists products[p] itself.
+    supplier: product -> supplier price; supplier_available is False without a supplier file.
+    """
+
+    def __init__(self, weeks, products, observed_prices, supplier, supplier_available=True):
+        self.weeks = list(weeks)
+        self.products = list(products)
+        self.product_index = {name: i for i, name in enumerate(self.products)}
+        self.observed = ~np.isnan(observed_prices)
+        self.matrix = _forward_fill(observed_prices)
+        self.supplier = dict(supplier)
+        self.supplier_available = supplier_available
+        self._weeks = np.asarray(self.weeks)
+        self._week_set = set(self.weeks)
+
+    def has_week(self, week) -> bool:
+        """True if week has its own prices file."""
+        return week in self._week_set
+
+    def row(self, week) -> int:
+        """Row of the latest week <= week, or -1 if week is before the first prices file."""
+        return int(np.searchsorted(self._weeks, week, side="right")) - 1
+
+    def _columns(self, products):
+        return np.array([self.product_index.get(name, -1) for name in products], dtype=np.int64)
+
+    def vector(self, week, products=None, default: float = 0.0):
+        """As-of prices in week for products (all timeline products if None)."""
+        return self.matrix_for([week], products, default)[0]
+
+    def matrix_for(self, weeks, products=None, default: float = 0.0):
+        """As-of prices, one row per week in weeks and one column per product."""
+        if products is None:
+            products = self.products
+        rows = np.array([self.row(week) for week in weeks], dtype=np.int64)
+        columns = self._columns(products)
+        # An extra NaN row and column stand for "no week yet" and "unknown product"
+        padded = np.full((len(self.weeks) + 1, len(self.products) + 1), np.nan)
+        padded[:-1, :-1] = self.matrix
+        values = padded[rows[:, None], columns[None, :]]
+        return np.where(np.isnan(values), default, values)
+
+    def price_at(self, product, week, default: float = 0.0) -> float:
+        """As-of retail price of one product in week."""
+        return float(self.vector(week, [product], default)[0])
+
+    def prices(self, week) -> dict:
+        """product -> as-of price in week, for the products priced by then."""
+        i = self.row(week)
+        if i < 0:
+            return {}
+        return {name: float(price) for name, price in zip(self.products, self.matrix[i]) if not np.isnan(price)}
+
+    def latest(self) -> dict:
+        """product -> last known retail price."""
+        return self.prices(self.weeks[-1]) if self.weeks else {}
+
+    def supplier_vector(self, products=None, default: float = 0.0):
+        """Supplier prices for products (all timeline products if None)."""
+        if products is None:
+            products = self.products
+        return np.array([self.supplier.get(name, default) for name in products], dtype=float)
+
+
+def _forward_fill(values):
+    """Replace NaN entries with the last non-NaN value above them in the same column."""
+    if not values.size:
+        return values.copy()
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def _price_files(prices_dir):
+    """[(week, path)] for every prices_<week>.json in prices_dir, in week order."""
+    files = []
+    for path in prices_dir.glob("prices_*.json"):
+        suffix = path.stem.split("_")[1]
+        if suffix.isdigit():
+            files.append((int(suffix), path))
+    return sorted(files)
+
+
+def build_price_timeline(prices_dir=PRICES_DIR, supplier_file=SUPPLIER_FILE) -> PriceTimeline:
+    """Read every prices file in prices_dir and the supplier file. Unreadable files are skipped."""
+    weeks, week_prices, products = [], [], {}
+    for week, path in _price_files(prices_dir):
+        try:
+            prices = _numeric_prices(load_json(path))
+        except (OSError, ValueError):
+            continue
+        for name in prices:
+            products.setdefault(name, len(products))
+        weeks.append(week)
+        week_prices.append(prices)
+
+    observed = np.full((len(weeks), len(products)), np.nan)
+    for i, prices in enumerate(week_prices):
+        observed[i, [products[name] for name in prices]] = list(prices.values())
+
+    try:
+        supplier = _numeric_prices(load_json(supplier_file))
+        supplier_available = True
+    except (OSError, ValueError):
+        supplier, supplier_available = {}, False
+    return PriceTimeline(weeks, list(products), observed, supplier, supplier_available)
+
+
+def get_price_timeline() -> PriceTimeline:
+    """Return the timeline for the current prices and supplier files, rebuilding it when they change."""
+    global _timeline, _timeline_version
+    version = dataset_version(input_files(kinds=("prices",), shared=False) + [SUPPLIER_FILE])
+    with _lock:
+        if _timeline is None or _timeline_version != version:
+            _timeline = build_price_timeline()
+            _timeline_version = version
+        return _timeline
+
+
+if __name__ == "__main__":
+    import sys
+
+    timeline = get_price_timeline()
+    week = int(sys.argv[1]) if len(sys.argv) > 1 else (timeline.weeks[-1] if timeline.weeks else 0)
+    print(f"Weeks with prices: {timeline.weeks}")
+    print(f"{'Product':<20} {'Retail (as of week ' + str(week) + ')':>24} {'Supplier':>10}")
+    retail = timeline.vector(week)
+    for name, price, buy in zip(timeline.products, retail, timeline.supplier_vector()):
+        print(f"{name:<20} {price:>24.2f} {buy:>10.2f}")
@@ -0,0 +1,177 @@
+# product_bitmap.py
+"""
+Packed product-presence bitmaps over a week's receipts.
+
+For every product the index keeps one bitset with bit t set when receipt
+(transaction) t has at least one line of that product, packed eight receipts
+per byte. "Receipts containing any / all of these products" is then an OR /
+AND over a few rows instead of a Python loop over records:
+    bits = bitmap.any_of(["Cola", "Chips"])     receipts with Cola or Chips
+    bitmap.count(bits)                          how many there are
+    bitmap.line_mask(lines, bits)               their line items in WeekLines
+Receipt numbers follow WeekLines.transaction (file order, days ascending).
+Basket analysis counts receipts per product pair with the same rows.
+"""
+import numpy as np
+from dataset import weekly_file
+from file_cache import cached
+from transaction_store import WeekLines, load_lines_file
+
+MATCH_MODES = ("any", "all")
+
+# Set bits per byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+class ProductBitmap:
+    """
+    products: product names; bits[p]: packed receipt bitset of products[p]
+    (uint8, ceil(n_receipts / 8) bytes, most significant bit first).
+    """
+
+    def __init__(self, products, bits, n_receipts):
+        self.products = list(products)
+        self.product_index = {name: i for i, name in enumerate(self.products)}
+        self.bits = bits
+        self.n_receipts = n_receipts
+
+    def empty(self):
+        return np.zeros(self.bits.shape[1], dtype=np.uint8)
+
+    def bitset(self, product):
+        """Packed receipts containing one product (none if it is unknown)."""
+        p = self.product_index.get(product)
+        return self.bits[p] if p is not None else self.empty()
+
+    def any_of(self, products):
+        """Packed receipts containing at least one of products."""
+        rows = [self.product_index[name] for name in products if name in self.product_index]
+        if not rows:
+            return self.empty()
+        return np.bitwise_or.reduce(self.bits[rows], axis=0)
+
+    def all_of(self, products):
+        """Packed receipts containing every one of products (all receipts if products is empty)."""
+        products = list(products)
+        if any(name not in self.product_index for name in products):
+            return self.empty()
+        if not products:
+            return np.packbits(np.ones(self.n_receipts, dtype=bool))
+        rows = [self.product_index[name] for name in products]
+        return np.bitwise_and.reduce(self.bits[rows], axis=0)
+
+    def query(self, products, match: str = "any"):
+        """any_of or all_of, by match ("any" / "all")."""
+        if match not in MATCH_MODES:
+            raise ValueError(f"match must be one of {MATCH_MODES}, not {match!r}")
+        return self.any_of(products) if match == "any" else self.all_of(products)
+
+    def products_containing(self, substrings):
+        """Product names containing any of the substrings, case-insensitively."""
+        substrings = [s.lower() for s in substrings]
+        return [name for name in self.products if any(s in str(name).lower() for s in substrings)]
+
+    def count(self, bits) -> int:
+        """Number of receipts in a packed bitset."""
+        return int(_POPCOUNT[bits].sum())
+
+    def mask(self, bits):
+        """Boolean mask over receipts for a packed bitset."""
+        return np.unpackbits(bits, count=self.n_receipts).astype(bool)
+
+    def line_mask(self, lines: WeekLines, bits):
+        """Boolean mask over the lines of the receipts in a packed bitset."""
+        return self.mask(bits)[lines.transaction]
+
+    def receipt_counts(self):
+        """Receipts per product."""
+        return _POPCOUNT[self.bits].sum(axis=1)
+
+    def pair_counts(self):
+        """products × products receipts containing both (the diagonal is receipt_counts())."""
+        n = len(self.products)
+        counts = np.zeros((n, n), dtype=np.int64)
+        for p in range(n):
+            counts[p] = _POPCOUNT[self.bits & self.bits[p]].sum(axis=1)
+        return counts
+
+    def top_pairs(self, n: int = 10):
+        """
+        [(product_a, product_b, receipts, confidence a→b, lift)] for the product pairs
+        bought together most often.
+        """
+        counts = self.pair_counts()
+        single = np.diag(counts).astype(float)
+        a, b = np.triu_indices(len(self.products), k=1)
+        together = counts[a, b]
+        order = np.argsort(-together, kind="stable")[:n]
+        pairs = []
+        for i in order:
+            if not together[i]:
+                break
+            p, q = a[i], b[i]
+            confidence = together[i] / single[p]
+            lift = together[i] * self.n_receipts / (single[p] * single[q])
+            pairs.append((self.products[p], self.products[q], int(together[i]), float(confidence), float(lift)))
+        return pairs
+
+
+def build_bitmap(products, product, transaction, n_receipts) -> ProductBitmap:
+    """Bitmap from per-line product and receipt indexes."""
+    present = np.zeros((len(products), n_receipts), dtype=bool)
+    present[product, transaction] = True
+    return ProductBitmap(products, np.packbits(present, axis=1), n_receipts)
+
+
+def bitmap_from_lines(lines: WeekLines) -> ProductBitmap:
+    return build_bitmap(lines.products, lines.product, lines.transaction, lines.n_transactions)
+
+
+def bitmap_from_receipts(receipt_products) -> ProductBitmap:
+    """Bitmap from one iterable of product names per receipt, in receipt order."""
+    products, product, transaction = {}, [], []
+    n_receipts = 0
+    for t, names in enumerate(receipt_products):
+        n_receipts = t + 1
+        for name in names:
+            product.append(products.setdefault(name, len(products)))
+            transaction.append(t)
+    return build_bitmap(list(products), np.array(product, dtype=np.int64), np.array(transaction, dtype=np.int64), n_receipts)
+
+
+def _bitmap_file(path) -> ProductBitmap:
+    return bitmap_from_lines(load_lines_file(path))
+
+
+def get_product_bitmap(week_number: int) -> ProductBitmap:
+    """Cached bitmap for a week. Raises FileNotFoundError if the week is missing."""
+    return cached(weekly_file("transactions", week_number), _bitmap_file)
+
+
+def basket_line_mask(week_number: int, products, match: str = "any"):
+    """(WeekLines, line mask) for the lines of receipts containing any/all of products."""
+    lines = load_lines_file(weekly_file("transactions", week_number))
+    bitmap = get_product_bitmap(week_number)
+    return lines, bitmap.line_mask(lines, bitmap.query(products, match))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print('Usage: python product_bitmap.py <week_number> ["product,product" [any|all]]')
+        sys.exit(1)
+
+    bitmap = get_product_bitmap(int(sys.argv[1]))
+    if len(sys.argv) > 2:
+        names = [name.strip() for name in sys.argv[2].split(",")]
+        match = sys.argv[3] if len(sys.argv) > 3 else "any"
+        bits = bitmap.query(names, match)
+        print(f"{bitmap.count(bits)} of {bitmap.n_receipts} receipts contain {match} of {names}")
+    else:
+        print(f"{bitmap.n_receipts} receipts, {len(bitmap.products)} products")
+        for name, count in zip(bitmap.products, bitmap.receipt_counts().tolist()):
+            print(f"  {name:<30} {count:>8}")
+        print("\nBought together most often:")
+        for a, b, together, confidence, lift in bitmap.top_pairs():
+            print(f"  {a} + {b}: {together} receipts, {confidence:.0%} of {a}, lift {lift:.2f}")
@@ -0,0 +1,216 @@
+# record_layout.py
+"""
+Layout detection and normalization for transaction records.
+
+Older files describe a receipt's lines in several ways:
+    items      {"items"/"products": [{"item"/"name"/"product": ..., "qty"/"quantity"/"amount": ...}]}
+    merch_types {"merch_types": [...], "merch_amounts": [...]}   (the canonical layout)
+    merch_keys {"merch_keys": [...], "merch_amounts": [...]}
+    merch_dict {"merch": {name: qty}}
+    merch_list {"merch": [name, ...]}                             (one unit each)
+
+normalize_records() (and RecordNormalizer, for streamed reads) detects the
+layout once, from the first recognizable record, and then runs only that
+layout's extractor for every record; a record it does not fit is probed
+against all layouts in priority order. Names become str and amounts float in
+one pass per record. The result is columnar, in the canonical
+merch_types/merch_amounts form, with the records that had no usable layout
+reported in `rejected`.
+"""
+
+LAYOUT_ORDER = ("items", "merch_types", "merch_keys", "merch_dict", "merch_list")
+
+
+class NormalizedRecords:
+    """
+    Canonical columns for a sequence of (day, record):
+    day[i], merch_types[i] (names as str), merch_amounts[i] (floats) per accepted record.
+    layout: the layout detected for the file (None if no record was recognizable).
+    rejected: [(position, day, reason)] for records that were dropped.
+    dropped_lines: lines dropped from accepted records (missing name or non-numeric amount).
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.day = []
+        self.merch_types = []
+        self.merch_amounts = []
+        self.rejected = []
+        self.dropped_lines = 0
+
+    def __len__(self):
+        return len(self.day)
+
+    def records(self):
+        """Iterate (day, merch_types, merch_amounts) per accepted record."""
+        return zip(self.day, self.merch_types, self.merch_amounts)
+
+
+def _pairs(names, amounts):
+    """(names, amounts) keeping only lines with a name and a numeric amount; fast path first."""
+    if None not in names:
+        try:
+            return [str(n) for n in names], [float(q) for q in amounts], 0
+        except (TypeError, ValueError):
+            pass
+    kept_names, kept_amounts = [], []
+    for n, q in zip(names, amounts):
+        if n is None:
+            continue
+        try:
+            q = float(q)
+        except (TypeError, ValueError):
+            continue
+        kept_names.append(str(n))
+        kept_amounts.append(q)
+    return kept_names, kept_amounts, len(names) - len(kept_names)
+
+
+# ---------------------------------------------------------------------
+# Extractors: record -> (names, amounts, dropped) or None if the layout does not fit
+# ---------------------------------------------------------------------
+def _extract_items(rec):
+    items = rec.get("items") or rec.get("products")
+    if not (isinstance(items, list) and items and isinstance(items[0], dict)):
+        return None
+    names = [it.get("item") or it.get("name") or it.get("product") for it in items]
+    amounts = [it.get("qty") or it.get("quantity") or it.get("amount") or 1 for it in items]
+    return _pairs(names, amounts)
+
+
+def _list_extractor(key):
+    def extract(rec):
+        names, amounts = rec.get(key), rec.get("merch_amounts")
+        if not (isinstance(names, list) and isinstance(amounts, list) and len(names) == len(amounts)):
+            return None
+        return _pairs(names, amounts)
+    return extract
+
+
+def _extract_merch_dict(rec):
+    merch = rec.get("merch")
+    if not isinstance(merch, dict):
+        return None
+    return _pairs(list(merch), [1 if q is None else q for q in merch.values()])
+
+
+def _extract_merch_list(rec):
+    merch = rec.get("merch")
+    if not isinstance(merch, list):
+        return None
+    names = [str(n) for n in merch if n is not None]
+    return names, [1.0] * len(names), len(merch) - len(names)
+
+
+EXTRACTORS = {
+    "items": _extract_items,
+    "merch_types": _list_extractor("merch_types"),
+    "merch_keys": _list_extractor("merch_keys"),
+    "merch_dict": _extract_merch_dict,
+    "merch_list": _extract_merch_list,
+}
+
+
+def probe(rec):
+    """(layout, (names, amounts, dropped)) for the first layout that fits rec, or (None, None)."""
+    for layout in LAYOUT_ORDER:
+        result = EXTRACTORS[layout](rec)
+        if result is not None:
+            return layout, result
+    return None, None
+
+
+def extract_record(rec):
+    """[(name, qty), ...] for one record with the priority rules of probe()."""
+    _, result = probe(rec)
+    if result is None:
+        return []
+    names, amounts, _ = result
+    return list(zip(names, amounts))
+
+
+def compile_extractor(layout):
+    """
+    Extractor specialised for one layout: record -> (names, amounts, dropped), or None.
+    Records the layout does not fit fall back to probe().
+    """
+    fast = EXTRACTORS[layout]
+
+    def extract(rec):
+        result = fast(rec)
+        if result is None:
+            _, result = probe(rec)
+        return result
+    return extract
+
+
+class RecordNormalizer:
+    """
+    Record-at-a-time normalization for one file, for streamed reads. The layout is
+    detected from the first recognizable record unless given; rejected and
+    dropped_lines accumulate as in NormalizedRecords.
+    """
+
+    def __init__(self, layout=None):
+        self.layout = layout
+        self.rejected = []
+        self.dropped_lines = 0
+        self._extract = compile_extractor(layout) if layout else None
+        self._position = 0
+
+    def normalize(self, day, rec):
+        """(merch_types, merch_amounts) for one record, or None if it is rejected."""
+        position = self._position
+        self._position += 1
+        if not isinstance(rec, dict):
+            self.rejected.append((position, day, "not an object"))
+            return None
+        if self._extract is None:
+            detected, _ = probe(rec)
+            if detected is None:
+                self.rejected.append((position, day, "no known layout"))
+                return None
+            self.layout = detected
+            self._extract = compile_extractor(detected)
+        result = self._extract(rec)
+        if result is None:
+            self.rejected.append((position, day, "no known layout"))
+            return None
+        names, amounts, dropped = result
+        self.dropped_lines += dropped
+        return names, amounts
+
+
+def normalize_records(day_records, layout=None):
+    """
+    Normalize an iterable of (day, record) into columns. Non-dict records and
+    records without any known layout are rejected.
+    """
+    normalizer = RecordNormalizer(layout)
+    normalized = NormalizedRecords(layout)
+    for day, rec in day_records:
+        result = normalizer.normalize(day, rec)
+        if result is None:
+            continue
+        normalized.day.append(day)
+        normalized.merch_types.append(result[0])
+        normalized.merch_amounts.append(result[1])
+    normalized.layout = normalizer.layout
+    normalized.rejected = normalizer.rejected
+    normalized.dropped_lines = normalizer.dropped_lines
+    return normalized
+
+
+if __name__ == "__main__":
+    import sys
+    from dataset import TRANSACTIONS_DIR
+    from transaction_stream import iter_transactions
+
+    paths = sys.argv[1:] or sorted(TRANSACTIONS_DIR.glob("transactions_*.json"))
+    for path in paths:
+        normalizer = RecordNormalizer()
+        accepted = sum(normalizer.normalize(day, rec) is not None for day, rec in iter_transactions(path))
+        print(f"{path}: layout {normalizer.layout}, {accepted} records, "
+              f"{len(normalizer.rejected)} rejected, {normalizer.dropped_lines} lines dropped")
+        for position, day, reason in normalizer.rejected[:10]:
+            print(f"  record {position} (day {day}): {reason}")
@@ -1,115 +1,72 @@
 # revenue_per_product.py
-import json
-from collections import defaultdict
 from pathlib import Path
+import numpy as np
 import matplotlib.pyplot as plt
-import plotly.graph_objects as go
+import fast_figure as ff
+from week_aggregate import get_week_aggregate
+from file_cache import load_json
+from price_timeline import get_price_timeline
 
-TRANSACTIONS_DIR = Path("transactions")
-PRICES_DIR = Path("prices")
 AMOUNTS_DIR = Path("amounts")
-SUPPLIER_FILE = Path("supplier_prices.json")
 
 
-def generate_revenue_per_product_figure(week_number: int):
+def product_profits(week_number: int, aggregate=None) -> dict:
     """
-    Returns a Plotly figure for revenue/profit per product for the given week.
-    Suitable for dashboard usage.
+    product -> sales revenue minus stock cost for the products stocked in a week,
+    with prices from the price timeline. Raises FileNotFoundError if the week has
+    no stock, prices or supplier file.
     """
-    file_transactions = TRANSACTIONS_DIR / f"transactions_{week_number}.json"
-    file_weekly_prices = PRICES_DIR / f"prices_{week_number}.json"
-    file_stock = AMOUNTS_DIR / f"amounts_{week_number}.json"
-    file_supplier_prices = SUPPLIER_FILE
+    timeline = get_price_timeline()
+    if not timeline.has_week(week_number) or not timeline.supplier_available:
+        raise FileNotFoundError(f"No prices for week {week_number}")
+    if aggregate is None:
+        aggregate = get_week_aggregate(week_number)
+    stock_data = load_json(AMOUNTS_DIR / f"amounts_{week_number}.json")
+
+    sold_totals = aggregate.totals_by_name()
+    products = list(stock_data)
+    stock = np.array(list(stock_data.values()), dtype=float)
+    sold = np.array([sold_totals.get(merch, 0) for merch in products], dtype=float)
+
+    stock_cost = stock * timeline.supplier_vector(products)
+    sales_revenue = sold * timeline.vector(week_number, products)
+    return dict(zip(products, (sales_revenue - stock_cost).tolist()))
 
+
+def generate_revenue_per_product_figure(week_number: int, aggregate=None):
+    """
+    Returns a Plotly figure for revenue/profit per product for the given week.
+    Suitable for dashboard usage. aggregate: the week's WeekAggregate, if already built.
+    """
     try:
-        with open(file_transactions, "r") as f:
-            transactions = json.load(f)
-        with open(file_supplier_prices, "r") as f:
-            supplier_prices = json.load(f)
-        with open(file_weekly_prices, "r") as f:
-            weekly_prices = json.load(f)
-        with open(file_stock, "r") as f:
-            stock_data = json.load(f)
+        profit_data = product_profits(week_number, aggregate)
     except FileNotFoundError:
-        return go.Figure()
-
-    # Sum up products sold
-    sold_totals = defaultdict(int)
-    for trans_list in transactions.values():
-        for t in trans_list:
-            for merch, amount in zip(t.get("merch_types", []), t.get("merch_amounts", [])):
-                sold_totals[merch] += amount
-
-    # Calculate profit per product
-    profit_data = {}
-    for merch, stock_amount in stock_data.items():
-        sold_amount = sold_totals.get(merch, 0)
-        buy_price = supplier_prices.get(merch, 0)
-        sell_price = weekly_prices.get(merch, 0)
-
-        stock_cost = stock_amount * buy_price
-        sales_revenue = sold_amount * sell_price
-        profit = sales_revenue - stock_cost
-        profit_data[merch] = profit
-
-    # Build Plotly figure
+        return ff.empty_figure()
+
+    # Build the figure
     labels = list(profit_data.keys())
     profits = list(profit_data.values())
     colors = ["green" if p >= 0 else "red" for p in profits]
 
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=labels, y=profits, marker_color=colors))
-    fig.update_layout(
+    return ff.figure(
+        [ff.bar(x=labels, y=profits, marker=dict(color=colors))],
         title=f"Week {week_number} — Profit per Product",
-        xaxis_title="Product",
-        yaxis_title="Profit (kr)",
-        template="plotly_white",
-        xaxis_tickangle=-45
+        xaxis=ff.axis("Product", tickangle=-45),
+        yaxis=ff.axis("Profit (kr)"),
+        template_name="plotly_white",
     )
-    return fig
 
 
 def show_revenue_per_product_matplotlib(week_number: int):
     """
     Produces the original matplotlib graph for standalone usage.
     """
-    file_transactions = TRANSACTIONS_DIR / f"transactions_{week_number}.json"
-    file_weekly_prices = PRICES_DIR / f"prices_{week_number}.json"
-    file_stock = AMOUNTS_DIR / f"amounts_{week_number}.json"
-    file_supplier_prices = SUPPLIER_FILE
-
     try:
-        with open(file_transactions, "r") as f:
-            transactions = json.load(f)
-        with open(file_supplier_prices, "r") as f:
-            supplier_prices = json.load(f)
-        with open(file_weekly_prices, "r") as f:
-            weekly_prices = json.load(f)
-        with open(file_stock, "r") as f:
-            stock_data = json.load(f)
+        profit_data = product_profits(week_number)
     except FileNotFoundError as e:
         print(f"⚠️ File not found: {e}")
         return
 
-    # Sum up products sold
-    sold_totals = defaultdict(int)
-    for trans_list in transactions.values():
-        for t in trans_list:
-            for merch, amount in zip(t.get("merch_types", []), t.get("merch_amounts", [])):
-                sold_totals[merch] += amount
-
-    # Calculate profit per product
-    profit_data = {}
-    for merch, stock_amount in stock_data.items():
-        sold_amount = sold_totals.get(merch, 0)
-        buy_price = supplier_prices.get(merch, 0)
-        sell_price = weekly_prices.get(merch, 0)
-
-        stock_cost = stock_amount * buy_price
-        sales_revenue = sold_amount * sell_price
-        profit = sales_revenue - stock_cost
-        profit_data[merch] = profit
-
     labels = list(profit_data.keys())
     profits = [profit_data[l] for l in labels]
     colors = ['green' if p >= 0 else 'red' for p in profits]
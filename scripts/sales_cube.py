@@ -0,0 +1,110 @@
+# sales_cube.py
+"""
+Units sold by (week, day, product, register worker) as one dense NumPy cube.
+
+The cube is built once per dataset version from the transaction store, with
+revenue (units × that week's retail price) and cost (units × supplier price)
+cubes alongside. count_weekly_sales and the daily sales timeline are slices
+and sums of these arrays. The day axis covers every day key in the files
+(at least days 0-7).
+"""
+import threading
+import numpy as np
+from dataset import SUPPLIER_FILE, available_weeks, dataset_version, input_files
+from price_timeline import get_price_timeline
+from transaction_store import load_week_lines
+
+N_DAYS = 8  # day numbers are used directly as the day index (at least 0-7)
+
+_lock = threading.Lock()
+_cube = None
+_cube_version = None
+
+
+class SalesCube:
+    """
+    units[w, d, p, k]: units of product p sold on day d of weeks[w] by workers[k].
+    product_rank[w, p]: order in which product p first appeared in week w (-1 if it
+    did not), so week-level charts can keep the file's product order.
+    day_present[w, d]: whether day d is a key in that week's transaction file.
+    """
+
+    def __init__(self, weeks, products, workers, units, product_rank, day_present, revenue, cost):
+        self.weeks = weeks
+        self.products = products
+        self.workers = workers
+        self.week_index = {w: i for i, w in enumerate(weeks)}
+        self.product_index = {p: i for i, p in enumerate(products)}
+        self.worker_index = {k: i for i, k in enumerate(workers)}
+
+        self.units = units
+        self.product_rank = product_rank
+        self.day_present = day_present
+        self.revenue = revenue
+        self.cost = cost
+
+    def has_week(self, week_number) -> bool:
+        return week_number in self.week_index
+
+    def week_product_totals(self):
+        """weeks × products units."""
+        return self.units.sum(axis=(1, 3))
+
+    def daily_series(self):
+        """
+        Flatten week-days into one timeline: returns ([(week, day), ...], points × products)
+        covering only days present in the files.
+        """
+        w_idx, d_idx = np.nonzero(self.day_present)
+        keys = [(self.weeks[w], int(d)) for w, d in zip(w_idx, d_idx)]
+        return keys, self.units.sum(axis=3)[w_idx, d_idx]
+
+
+def build_sales_cube() -> SalesCube:
+    weeks = available_weeks("transactions")
+    week_lines = [load_week_lines(w) for w in weeks]
+
+    products, workers = {}, {}
+    for lines in week_lines:
+        for name in lines.products:
+            products.setdefault(name, len(products))
+        for worker_id in lines.workers:
+            workers.setdefault(worker_id, len(workers))
+
+    n_weeks, n_products, n_workers = len(weeks), len(products), len(workers)
+    n_days = max([N_DAYS] + [max(lines.days) + 1 for lines in week_lines if lines.days])
+    units = np.zeros((n_weeks, n_days, n_products, n_workers), dtype=np.int64)
+    product_rank = np.full((n_weeks, n_products), -1, dtype=np.int32)
+    day_present = np.zeros((n_weeks, n_days), dtype=bool)
+
+    for w, lines in enumerate(week_lines):
+        product_map = np.array([products[name] for name in lines.products], dtype=np.int64)
+        worker_map = np.array([workers[worker_id] for worker_id in lines.workers], dtype=np.int64)
+        product_rank[w, product_map] = np.arange(len(product_map))
+        day_present[w, lines.days] = True
+        if len(lines.product):
+            np.add.at(units[w], (lines.day, product_map[lines.product], worker_map[lines.worker]), lines.quantity)
+
+    # Retail price per (week, product) and supplier price per product
+    product_names = list(products)
+    # (weeks without their own prices file have no revenue)
+    timeline = get_price_timeline()
+    has_prices = np.array([timeline.has_week(week) for week in weeks], dtype=bool)
+    retail = np.where(has_prices[:, None], timeline.matrix_for(weeks, product_names), 0.0)
+    supplier = timeline.supplier_vector(product_names)
+
+    revenue = units * retail[:, None, :, None]
+    cost = units * supplier[None, None, :, None]
+
+    return SalesCube(weeks, product_names, list(workers), units, product_rank, day_present, revenue, cost)
+
+
+def get_sales_cube() -> SalesCube:
+    """Return the cube for the current transactions, prices and supplier prices, rebuilding it when they change."""
+    global _cube, _cube_version
+    version = dataset_version(input_files(kinds=("transactions", "prices"), shared=False) + [SUPPLIER_FILE])
+    with _lock:
+        if _cube is None or _cube_version != version:
+            _cube = build_sales_cube()
+            _cube_version = version
+        return _cube
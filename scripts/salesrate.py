@@ -1,32 +1,28 @@
 # scripts/salesrate_dash.py
-import json
-from collections import defaultdict
 from pathlib import Path
 import plotly.graph_objects as go
+import fast_figure as ff
+from week_aggregate import get_week_aggregate
+from file_cache import load_json
 
 TRANSACTIONS_DIR = Path("transactions")
 AMOUNTS_DIR = Path("amounts")
 
-def generate_salesrate_figure(week_num: int):
+def generate_salesrate_figure(week_num: int, aggregate=None):
+    """aggregate: the week's WeekAggregate, if the caller already has it."""
     transactions_path = TRANSACTIONS_DIR / f"transactions_{week_num}.json"
     stock_path = AMOUNTS_DIR / f"amounts_{week_num}.json"
 
-    if not transactions_path.exists() or not stock_path.exists():
-        return go.Figure()  # Return empty figure if missing
+    if (aggregate is None and not transactions_path.exists()) or not stock_path.exists():
+        return ff.empty_figure()  # Return empty figure if missing
 
-    with open(transactions_path, "r") as f:
-        transactions = json.load(f)
-    with open(stock_path, "r") as f:
-        stock_data = json.load(f)
+    if aggregate is None:
+        aggregate = get_week_aggregate(week_num)
+    stock_data = load_json(stock_path)
 
-    # Aggregate daily sales
-    sales_by_product = defaultdict(lambda: [0]*7)
-    for day_num in range(1, 8):
-        for t in transactions.get(str(day_num), []):
-            if t.get("transaction_type") != "customer_sale":
-                continue
-            for merch, amount in zip(t["merch_types"], t["merch_amounts"]):
-                sales_by_product[merch][day_num - 1] += amount
+    # Aggregate daily sales (days 1-7, customer sales only)
+    no_sales = [0] * 7
+    sales_by_product = aggregate.daily_sales_by_product()
 
     # Compute totals, estimated weekly rate
     products = []
@@ -35,7 +31,7 @@ def generate_salesrate_figure(week_num: int):
     stock_amount = []
 
     for product, stock in stock_data.items():
-        daily_sales = sales_by_product[product]
+        daily_sales = sales_by_product.get(product, no_sales)
         total = sum(daily_sales)
         running = 0
         stockout_day = None
@@ -75,21 +71,19 @@ def generate_salesrate_figure(week_num: int):
     # Create Plotly bar chart
     x = list(range(len(products)))
 
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=x, y=total_sold, width=0.25, name="Total Sold", marker_color="#1f77b4"))
-    fig.add_trace(go.Bar(x=x, y=estimated_weekly, width=0.25, name="Avg Rate ×7", marker_color="#ff7f0e"))
-    fig.add_trace(go.Bar(x=x, y=stock_amount, width=0.25, name="Stock Amount", marker_color="#2ca02c"))
-
-    fig.update_layout(
+    return ff.figure(
+        [
+            ff.bar(x=x, y=total_sold, width=0.25, name="Total Sold", marker=dict(color="#1f77b4")),
+            ff.bar(x=x, y=estimated_weekly, width=0.25, name="Avg Rate ×7", marker=dict(color="#ff7f0e")),
+            ff.bar(x=x, y=stock_amount, width=0.25, name="Stock Amount", marker=dict(color="#2ca02c")),
+        ],
         title=f"Sales vs Estimated Weekly Rate vs Stock — Week {week_num}",
         xaxis=dict(tickmode="array", tickvals=x, ticktext=products),
-        yaxis_title="Units",
+        yaxis=ff.axis("Units"),
         barmode="group",
-        template="plotly_white"
+        template_name="plotly_white"
     )
 
-    return fig
-
 # Optional: allow running standalone for quick check
 if __name__ == "__main__":
     import sys
@@ -101,4 +95,4 @@ if __name__ == "__main__":
 
     week = int(sys.argv[1])
     fig = generate_salesrate_figure(week)
-    fig.show()
+    go.Figure(fig).show()
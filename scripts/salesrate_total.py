@@ -1,33 +1,34 @@
 # scripts/salesrate_dash.py
-import json
 from collections import defaultdict
 from pathlib import Path
 import plotly.graph_objects as go
+from transaction_store import load_week_lines
+from file_cache import load_json
+from week_executor import map_weeks
 
 TRANSACTIONS_DIR = Path("transactions")
 AMOUNTS_DIR = Path("amounts")
 
-def calculate_weekly_metrics(week_num: int):
-    """Calculate metrics for a single week."""
+def week_daily_sales(lines) -> dict:
+    """Per-week partial for map_weeks: product -> customer-sale units on days 1-7."""
+    daily_matrix = lines.day_product_matrix(lines.sale)[:, 1:8]
+    return {merch: daily_matrix[i].tolist() for i, merch in enumerate(lines.products)}
+
+
+def calculate_weekly_metrics(week_num: int, daily_sales_by_product: dict = None):
+    """Calculate metrics for a single week, optionally from an already computed week_daily_sales()."""
     transactions_path = TRANSACTIONS_DIR / f"transactions_{week_num}.json"
     stock_path = AMOUNTS_DIR / f"amounts_{week_num}.json"
 
     if not transactions_path.exists() or not stock_path.exists():
         return {}
 
-    with open(transactions_path, "r") as f:
-        transactions = json.load(f)
-    with open(stock_path, "r") as f:
-        stock_data = json.load(f)
+    if daily_sales_by_product is None:
+        daily_sales_by_product = week_daily_sales(load_week_lines(week_num))
+    stock_data = load_json(stock_path)
 
-    # Aggregate daily sales
-    sales_by_product = defaultdict(lambda: [0]*7)
-    for day_num in range(1, 8):
-        for t in transactions.get(str(day_num), []):
-            if t.get("transaction_type") != "customer_sale":
-                continue
-            for merch, amount in zip(t["merch_types"], t["merch_amounts"]):
-                sales_by_product[merch][day_num - 1] += amount
+    # Aggregate daily sales (days 1-7, customer sales only)
+    sales_by_product = defaultdict(lambda: [0]*7, daily_sales_by_product)
 
     # Compute metrics per product
     product_metrics = {}
@@ -74,9 +75,10 @@ def calculate_weekly_metrics(week_num: int):
     return product_metrics
 
 
-def generate_salesrate_figure(week_num: int = None):
+def generate_salesrate_figure(week_num: int = None, max_workers=None):
     """
-    Generate sales rate figure. If week_num is None, aggregate across all weeks (excluding week 5).
+    Generate sales rate figure. If week_num is None, aggregate across all weeks (excluding week 5),
+    loading them in parallel with up to max_workers processes.
     """
     if week_num is not None:
         # Original single-week behavior
@@ -86,19 +88,14 @@ def generate_salesrate_figure(week_num: int = None):
         if not transactions_path.exists() or not stock_path.exists():
             return go.Figure()
 
-        with open(transactions_path, "r") as f:
-            transactions = json.load(f)
-        with open(stock_path, "r") as f:
-            stock_data = json.load(f)
+        lines = load_week_lines(week_num)
+        stock_data = load_json(stock_path)
 
-        # Aggregate daily sales
-        sales_by_product = defaultdict(lambda: [0]*7)
-        for day_num in range(1, 8):
-            for t in transactions.get(str(day_num), []):
-                if t.get("transaction_type") != "customer_sale":
-                    continue
-                for merch, amount in zip(t["merch_types"], t["merch_amounts"]):
-                    sales_by_product[merch][day_num - 1] += amount
+        # Aggregate daily sales (days 1-7, customer sales only)
+        daily_matrix = lines.day_product_matrix(lines.sale)[:, 1:8]
+        sales_by_product = defaultdict(lambda: [0]*7, {
+            merch: daily_matrix[i].tolist() for i, merch in enumerate(lines.products)
+        })
 
         products = []
         total_sold = []
@@ -149,10 +146,11 @@ def generate_salesrate_figure(week_num: int = None):
         weekly_data = {}
         
         # Collect data from all weeks
-        for week in range(0, 10):  # Check weeks 0-9
-            if week == 5:  # Exclude week 5
+        weeks = [week for week in range(0, 10) if week != 5]  # Check weeks 0-9, excluding week 5
+        for week, daily_sales in zip(weeks, map_weeks(week_daily_sales, weeks, max_workers)):
+            if daily_sales is None:
                 continue
-            metrics = calculate_weekly_metrics(week)
+            metrics = calculate_weekly_metrics(week, daily_sales)
             if metrics:
                 weekly_data[week] = metrics
                 all_products.update(metrics.keys())
@@ -1,28 +1,26 @@
 # scripts/salesrate_dash.py
-import json
 from pathlib import Path
 import plotly.graph_objects as go
+import fast_figure as ff
+from transaction_store import load_week_lines
+from file_cache import load_json
+from week_index import get_week_index, stream_sales_units, week_sales_units
 
 TRANSACTIONS_DIR = Path("transactions")
 AMOUNTS_DIR = Path("amounts")  # <-- new
 
-def calculate_weekly_total_sales(week_num: int) -> int:
-    """Return the total number of units sold across all products for a given week."""
+def calculate_weekly_total_sales(week_num: int, streaming: bool = False) -> int:
+    """
+    Return the total number of units sold across all products for a given week.
+    With streaming=True the file is read record by record in constant memory.
+    """
+    if streaming:
+        return stream_sales_units(week_num)
+
     transactions_path = TRANSACTIONS_DIR / f"transactions_{week_num}.json"
     if not transactions_path.exists():
         return 0
-
-    with open(transactions_path, "r") as f:
-        transactions = json.load(f)
-
-    total_sales = 0
-    for day_num in range(1, 8):
-        for t in transactions.get(str(day_num), []):
-            if t.get("transaction_type") != "customer_sale":
-                continue
-            total_sales += sum(t["merch_amounts"])
-
-    return total_sales
+    return week_sales_units(load_week_lines(week_num))
 
 
 def calculate_total_stock(week_num: int) -> int:
@@ -31,8 +29,7 @@ def calculate_total_stock(week_num: int) -> int:
     if not amounts_path.exists():
         return 0
 
-    with open(amounts_path, "r") as f:
-        stock_data = json.load(f)
+    stock_data = load_json(amounts_path)
 
     total_stock = 0
     for product, info in stock_data.items():
@@ -43,66 +40,68 @@ def calculate_total_stock(week_num: int) -> int:
     return total_stock
 
 
-def generate_total_sales_volume_timeseries(start_week=0, end_week=6):
-    """Generate a time-series showing weekly, cumulative, and stock total units."""
-    week_nums = list(range(start_week, end_week + 1))
-    weekly_totals = [calculate_weekly_total_sales(w) for w in week_nums]
-
-    # Compute cumulative totals
-    cumulative_totals = []
-    running_sum = 0
-    for val in weekly_totals:
-        running_sum += val
-        cumulative_totals.append(running_sum)
-
-    # Compute total stock per week
-    stock_totals = [calculate_total_stock(w) for w in week_nums]
-
-    # Create the figure
-    fig = go.Figure()
-
-    # Weekly sales totals
-    fig.add_trace(go.Scatter(
-        x=week_nums,
-        y=weekly_totals,
-        mode="lines+markers",
-        name="Weekly Sales Volume",
-        line=dict(width=3, color="#1f77b4"),
-        marker=dict(size=8)
-    ))
-
-    # Cumulative totals
-    fig.add_trace(go.Scatter(
-        x=week_nums,
-        y=cumulative_totals,
-        mode="lines+markers",
-        name="Cumulative Sales Volume",
-        line=dict(width=3, dash="dash", color="#ff7f0e"),
-        marker=dict(size=8)
-    ))
-
-    # Stock totals (new line)
-    fig.add_trace(go.Scatter(
-        x=week_nums,
-        y=stock_totals,
-        mode="lines+markers",
-        name="Total Stock Volume",
-        line=dict(width=3, dash="dot", color="#2ca02c"),
-        marker=dict(size=8)
-    ))
-
-    # Layout
-    fig.update_layout(
+def generate_total_sales_volume_timeseries(start_week=0, end_week=6, streaming=False, max_workers=None):
+    """
+    Generate a time-series showing weekly, cumulative, and stock total units for
+    the weeks in [start_week, end_week] (None = open end), read from the week index.
+    Unless streaming, weeks are loaded in parallel with up to max_workers processes.
+    """
+    index = get_week_index(streaming, max_workers)
+    week_nums = index.weeks_in(start_week, end_week)
+
+    # Cumulative volume counts from the first week of the range
+    weekly_totals = index.weekly("sales_volume", start_week, end_week).astype(int).tolist()
+    cumulative_totals = index.cumulative("sales_volume", start_week, end_week, from_start=True).astype(int).tolist()
+    stock_totals = index.weekly("stock", start_week, end_week).astype(int).tolist()
+
+    if start_week is None:
+        start_week = week_nums[0] if week_nums else 0
+    if end_week is None:
+        end_week = week_nums[-1] if week_nums else 0
+
+    traces = [
+        # Weekly sales totals
+        ff.scatter(
+            x=week_nums,
+            y=weekly_totals,
+            mode="lines+markers",
+            name="Weekly Sales Volume",
+            line=dict(width=3, color="#1f77b4"),
+            marker=dict(size=8)
+        ),
+        # Cumulative totals
+        ff.scatter(
+            x=week_nums,
+            y=cumulative_totals,
+            mode="lines+markers",
+            name="Cumulative Sales Volume",
+            line=dict(width=3, dash="dash", color="#ff7f0e"),
+            marker=dict(size=8)
+        ),
+        # Stock totals
+        ff.scatter(
+            x=week_nums,
+            y=stock_totals,
+            mode="lines+markers",
+            name="Total Stock Volume",
+            line=dict(width=3, dash="dot", color="#2ca02c"),
+            marker=dict(size=8)
+        ),
+    ]
+
+    return ff.figure(
+        traces,
         title=f"Total & Cumulative Sales Volume + Stock — Weeks {start_week} to {end_week}",
-        xaxis_title="Week Number",
-        yaxis_title="Units",
-        template="plotly_white",
+        xaxis=ff.axis("Week Number"),
+        yaxis=ff.axis("Units"),
+        template_name="plotly_white",
         legend=dict(x=0.02, y=0.98)
     )
 
-    return fig
-
 
 if __name__ == "__main__":
-    fig = generate_total_sales_volume_timeseries(0, 7)
-    fig.show()
+    import sys
+
+    # --stream: read transaction files record by record (constant memory)
+    fig = generate_total_sales_volume_timeseries(0, 7, streaming="--stream" in sys.argv)
+    go.Figure(fig).show()
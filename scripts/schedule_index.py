@@ -0,0 +1,127 @@
+# schedule_index.py
+"""
+Indexed view of schedules/schedules_<week>.json.
+
+Each week is parsed once per file version into a boolean
+on[worker, day, department, shift] matrix plus the entries in file order.
+Who worked registers on a day, shifts per worker and the weekly salary cost
+(scheduled-workers mask · salary vector) are then array reductions.
+"""
+import numpy as np
+from dataset import available_weeks, weekly_file
+from file_cache import cached, load_json
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+class WeekSchedule:
+    """
+    on[k, d, j, s]: workers[k] works shift shifts[s] in department departments[j] on days[d].
+    entries: (n, 4) int array of (day, worker, department, shift) indexes in file order.
+    """
+
+    def __init__(self, days, workers, departments, shifts, entries):
+        self.days = days
+        self.workers = workers
+        self.departments = departments
+        self.shifts = shifts
+        self.day_index = {d: i for i, d in enumerate(days)}
+        self.worker_index = {w: i for i, w in enumerate(workers)}
+        self.department_index = {d: i for i, d in enumerate(departments)}
+
+        self.entries = entries
+        self.on = np.zeros((len(workers), len(days), len(departments), len(shifts)), dtype=bool)
+        if len(entries):
+            self.on[entries[:, 1], entries[:, 0], entries[:, 2], entries[:, 3]] = True
+
+    def _select(self, department=None, day=None):
+        """on restricted to one department and/or day (missing ones select nothing)."""
+        on = self.on
+        if day is not None:
+            d = self.day_index.get(day.lower())
+            on = on[:, d:d + 1] if d is not None else on[:, :0]
+        if department is not None:
+            j = self.department_index.get(department)
+            on = on[:, :, j:j + 1] if j is not None else on[:, :, :0]
+        return on
+
+    def scheduled_mask(self, department=None, day=None):
+        """Boolean vector over workers: on at least one matching shift."""
+        return self._select(department, day).any(axis=(1, 2, 3))
+
+    def workers_on(self, department=None, day=None):
+        """Set of worker IDs on at least one matching shift."""
+        return {self.workers[k] for k in np.flatnonzero(self.scheduled_mask(department, day))}
+
+    def shift_counts(self, department=None):
+        """worker_id -> number of shifts worked this week."""
+        counts = self._select(department).sum(axis=(1, 2, 3))
+        return {self.workers[k]: int(counts[k]) for k in np.flatnonzero(counts)}
+
+    def salary_cost(self, registry) -> float:
+        """Weekly salary of everyone scheduled; workers missing from the registry cost 0."""
+        index = registry.indexes(self.workers)
+        salaries = np.where(index >= 0, registry.salaries[index], 0.0)
+        return float(self.scheduled_mask() @ salaries)
+
+    def day_entries(self, day):
+        """[(worker_id, department, shift), ...] for one day, in file order."""
+        d = self.day_index.get(day.lower())
+        if d is None:
+            return []
+        return [
+            (self.workers[k], self.departments[j], self.shifts[s])
+            for _, k, j, s in self.entries[self.entries[:, 0] == d]
+        ]
+
+
+def parse_schedule(path) -> WeekSchedule:
+    """Build a WeekSchedule from a day-name keyed schedule file. Shifts without a worker_id are skipped."""
+    schedule = load_json(path)
+    days = list(DAYS)
+    vocab = ({}, {}, {})  # workers, departments, shifts
+    entries = []
+    for day, day_schedule in schedule.items():
+        day = day.lower()
+        if day not in days:
+            days.append(day)
+        for shift in day_schedule:
+            if "worker_id" not in shift:
+                continue
+            keys = (shift["worker_id"], shift.get("department", ""), shift.get("shift"))
+            entries.append((days.index(day),) + tuple(v.setdefault(key, len(v)) for v, key in zip(vocab, keys)))
+    entries = np.array(entries, dtype=np.int64).reshape(-1, 4)
+    return WeekSchedule(days, *(list(v) for v in vocab), entries)
+
+
+def load_week_schedule(week_number: int) -> WeekSchedule:
+    """Cached schedule for a week. Raises FileNotFoundError or json.JSONDecodeError."""
+    return cached(weekly_file("schedules", week_number), parse_schedule)
+
+
+def weekly_salary_costs(weeks, registry):
+    """
+    Salary cost per week as one masked product: weeks × registry workers
+    scheduled matrix @ salary vector. Weeks without a readable schedule cost 0.
+    """
+    scheduled = np.zeros((len(weeks), len(registry)), dtype=bool)
+    for w, week in enumerate(weeks):
+        try:
+            schedule = load_week_schedule(week)
+        except (FileNotFoundError, ValueError):
+            continue
+        index = registry.indexes(schedule.workers)
+        known = index >= 0
+        scheduled[w, index[known]] = schedule.scheduled_mask()[known]
+    return scheduled @ registry.salaries
+
+
+if __name__ == "__main__":
+    from worker_registry import get_worker_registry
+
+    registry = get_worker_registry()
+    weeks = available_weeks("schedules")
+    for week, cost in zip(weeks, weekly_salary_costs(weeks, registry)):
+        schedule = load_week_schedule(week)
+        print(f"Week {week}: {len(schedule.workers_on())} workers, "
+              f"{len(schedule.workers_on('registers'))} on registers, salary {cost:,.2f} kr")
@@ -12,6 +12,8 @@ Example:
 import sys
 import json
 from pathlib import Path
+from schedule_index import DAYS, load_week_schedule
+from worker_registry import get_worker_registry
 
 WORKERS_FILE = Path("workers/workers.jsonl")
 SCHEDULES_DIR = Path("schedules")
@@ -19,23 +21,13 @@ SCHEDULES_DIR = Path("schedules")
 
 def load_workers():
     """Load worker data from JSONL file."""
-    workers = {}
     try:
-        with open(WORKERS_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    worker_data = json.loads(line)
-                    workers[worker_data["worker_id"]] = worker_data.get("name", worker_data["worker_id"])
-                except json.JSONDecodeError:
-                    continue
+        registry = get_worker_registry(WORKERS_FILE)
     except FileNotFoundError:
         print(f"Error: Workers file not found: {WORKERS_FILE}")
         sys.exit(1)
-    
-    return workers
+
+    return {worker_id: registry.name(worker_id, worker_id) for worker_id in registry.ids}
 
 
 def print_schedule(week_number):
@@ -45,8 +37,7 @@ def print_schedule(week_number):
     schedule_file = SCHEDULES_DIR / f"schedules_{week_number}.json"
     
     try:
-        with open(schedule_file, "r") as f:
-            schedule = json.load(f)
+        schedule = load_week_schedule(week_number)
     except FileNotFoundError:
         print(f"Error: Schedule file not found: {schedule_file}")
         sys.exit(1)
@@ -54,15 +45,14 @@ def print_schedule(week_number):
         print(f"Error: Invalid JSON in schedule file: {schedule_file}")
         sys.exit(1)
     
-    days = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    day_display = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    day_display = [day.capitalize() for day in DAYS]
     
     print(f"\n{'='*70}")
     print(f"SCHEDULE - WEEK {week_number}")
     print(f"{'='*70}\n")
     
-    for i, day in enumerate(days):
-        day_schedule = schedule.get(day, [])
+    for i, day in enumerate(DAYS):
+        day_schedule = schedule.day_entries(day)
         
         if not day_schedule:
             print(f"{day_display[i]}:")
@@ -75,11 +65,8 @@ def print_schedule(week_number):
         shift_1 = []
         shift_2 = []
         
-        for shift_data in day_schedule:
-            worker_id = shift_data.get("worker_id", "Unknown")
+        for worker_id, department, shift_num in day_schedule:
             worker_name = workers.get(worker_id, worker_id)
-            department = shift_data.get("department", "")
-            shift_num = shift_data.get("shift")
             
             worker_text = f"{worker_name} ({department})" if department else worker_name
             
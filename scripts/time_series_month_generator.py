@@ -3,8 +3,11 @@ import matplotlib.pyplot as plt
 from collections import defaultdict
 from pathlib import Path
 import re
+import numpy as np
+from downsample import minmax_indices
 
 TRANSACTIONS_DIR = Path("transactions")
+MAX_TICKS = 20
 
 def main():
     # Find all transaction_<n>.json files
@@ -49,16 +52,22 @@ def main():
     # Collect all days across the whole month
     days = sorted({d for d_lists in day_totals.values() for d in d_lists})
 
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
 
+    # Long histories are reduced to about one point per horizontal pixel (min/max per bucket keeps the spikes)
+    n_out = int(fig.get_figwidth() * fig.dpi)
+    reduced = len(days) > n_out
+    days_arr = np.array(days)
     for merch, day_values in day_totals.items():
-        y = [day_values.get(d, 0) for d in days]
-        plt.plot(days, y, marker="o", label=merch)
+        y = np.array([day_values.get(d, 0) for d in days])
+        keep = minmax_indices(y, n_out) if reduced else slice(None)
+        plt.plot(days_arr[keep], y[keep], marker=None if reduced else "o", label=merch)
 
     plt.xlabel("Day of Month")
     plt.ylabel("Quantity Sold")
     plt.title("Daglig salg per varetype (Hele måneden)")
-    plt.xticks(days, [str(d) for d in days])
+    tick_days = days[::max(1, -(-len(days) // MAX_TICKS))]
+    plt.xticks(tick_days, [str(d) for d in tick_days])
     plt.legend(title="Merch Type", bbox_to_anchor=(1.05, 1), loc="upper left")
     plt.tight_layout()
     plt.show()
@@ -1,63 +1,111 @@
 # daily_sales_time_series.py
-import json
-from collections import defaultdict
+"""
+Daily sales per product across all weeks.
+
+Points are plotted against their position on the week-day timeline (labelled
+W<week>-D<day>), so a zoom range maps directly onto array slices. When a
+product has more points in view than the plot is pixels wide, its series is
+reduced with downsample.minmax_indices (or lttb_indices); zooming in asks for
+the figure again with the new range and gets full detail back. Above
+SCATTERGL_THRESHOLD points in total the traces are drawn with WebGL.
+"""
 from pathlib import Path
+import numpy as np
 import plotly.graph_objects as go
+import fast_figure as ff
+from downsample import lttb_indices, minmax_indices
+from sales_cube import get_sales_cube
 
 TRANSACTIONS_DIR = Path("transactions")
 
-def generate_daily_sales_figure():
-    """Generate a Plotly figure showing daily sales per product across all available data."""
-    files = sorted(TRANSACTIONS_DIR.glob("transactions_*.json"))
-    if not files:
-        fig = go.Figure()
-        fig.update_layout(title="⚠️ No transaction files found")
-        return fig
-
-    # Aggregate daily sales: key=(week, day), value={product: amount}
-    daily_sales = defaultdict(lambda: defaultdict(int))
-    all_products = set()
-    all_dates = []
-
-    for file in files:
-        week_number = int(file.stem.split("_")[1])
-        with open(file, "r", encoding="utf-8") as f:
-            week_data = json.load(f)
-
-        for day_str, transactions in week_data.items():
-            day_number = int(day_str)
-            date_label = f"W{week_number}-D{day_number}"
-            all_dates.append(date_label)
-
-            for record in transactions:
-                merch_types = record.get("merch_types", [])
-                merch_amounts = record.get("merch_amounts", [])
-                for merch, amount in zip(merch_types, merch_amounts):
-                    daily_sales[merch][date_label] += int(amount)
-                    all_products.add(merch)
-
-    all_dates = sorted(all_dates, key=lambda x: (int(x.split("-")[0][1:]), int(x.split("-")[1][1:])))
-    
-    # Build Plotly figure
-    fig = go.Figure()
-    for product in sorted(all_products):
-        y = [daily_sales[product].get(date, 0) for date in all_dates]
-        fig.add_trace(go.Scatter(
-            x=all_dates,
-            y=y,
-            mode="lines+markers",
-            name=product
-        ))
-
-    fig.update_layout(
-        title="Daily Sales per Product Across All Weeks",
-        xaxis_title="Date (Week-Day)",
-        yaxis_title="Units Sold",
-        template="plotly_white",
+DEFAULT_WIDTH_PX = 1200      # plot width assumed when the browser has not reported one
+SCATTERGL_THRESHOLD = 5000   # total points above which traces use WebGL
+MAX_TICKS = 15
+
+
+def _visible_slice(n_points, x_range):
+    """Slice of the timeline inside x_range, plus one point either side so lines reach the edges."""
+    if not x_range:
+        return slice(0, n_points)
+    lo, hi = sorted(float(v) for v in x_range)
+    start = max(0, int(np.floor(lo)))
+    stop = min(n_points, int(np.ceil(hi)) + 1)
+    return slice(max(0, start - 1), min(n_points, stop + 1))
+
+
+def _reduce(x, y, n_out, method):
+    if method == "lttb":
+        return lttb_indices(x, y, n_out)
+    return minmax_indices(y, n_out)
+
+
+def generate_daily_sales_figure(x_range=None, width_px=None, method="minmax"):
+    """
+    Generate a Plotly figure showing daily sales per product across all available data.
+    x_range: [start, end] of the visible x-axis in point positions (None = everything).
+    width_px: plot width in pixels; each series is reduced to about that many points.
+    method: "minmax" (keeps every spike) or "lttb".
+    """
+    cube = get_sales_cube()
+    if not cube.weeks:
+        return ff.empty_figure(title="⚠️ No transaction files found")
+
+    # One point per (week, day) present in the files, one column per product
+    date_keys, daily_sales = cube.daily_series()
+    all_dates = np.array([f"W{week_number}-D{day_number}" for week_number, day_number in date_keys])
+    sold_products = np.flatnonzero((cube.product_rank >= 0).any(axis=0))
+
+    view = _visible_slice(len(all_dates), x_range)
+    positions = np.arange(len(all_dates))[view]
+    n_out = max(4, int(width_px or DEFAULT_WIDTH_PX))
+
+    series = []
+    for p in sorted(sold_products, key=lambda p: cube.products[p]):
+        y = daily_sales[view, p]
+        keep = _reduce(positions, y, n_out, method) if len(y) > n_out else slice(None)
+        series.append((cube.products[p], positions[keep], y[keep]))
+
+    n_shown = sum(len(x) for _, x, _ in series)
+    reduced = len(positions) > n_out
+    trace_type = "scattergl" if n_shown > SCATTERGL_THRESHOLD else "scatter"
+    traces = [
+        {
+            "type": trace_type,
+            "x": x.tolist(),
+            "y": y.tolist(),
+            "text": all_dates[x].tolist(),
+            "hovertemplate": "%{text}: %{y}<extra>%{fullData.name}</extra>",
+            "mode": "lines" if reduced else "lines+markers",
+            "name": name,
+        }
+        for name, x, y in series
+    ]
+
+    # Label at most MAX_TICKS positions of the visible part of the timeline
+    step = max(1, int(np.ceil(len(positions) / MAX_TICKS)))
+    tickvals = positions[::step]
+    xaxis = ff.axis(
+        "Date (Week-Day)",
+        tickmode="array",
+        tickvals=tickvals.tolist(),
+        ticktext=all_dates[tickvals].tolist(),
+    )
+    if x_range:
+        xaxis["range"] = list(x_range)
+
+    title = "Daily Sales per Product Across All Weeks"
+    if reduced:
+        title += f" (downsampled, {len(positions)} days in view)"
+    return ff.figure(
+        traces,
+        title=title,
+        xaxis=xaxis,
+        yaxis=ff.axis("Units Sold"),
+        template_name="plotly_white",
         legend=dict(orientation="v", x=1.05, y=1),
-        margin=dict(l=60, r=200, t=80, b=60)
+        margin=dict(l=60, r=200, t=80, b=60),
+        uirevision="daily-sales",
     )
-    return fig
 
 
 # ---------------------------------------------------------------------
@@ -65,4 +113,4 @@ def generate_daily_sales_figure():
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
     fig = generate_daily_sales_figure()
-    fig.show()
+    go.Figure(fig).show()
@@ -0,0 +1,152 @@
+# transaction_sidecar.py
+"""
+Columnar Parquet sidecars for transactions_<week>.json.
+
+Each sidecar holds one row per line item (merch_types/merch_amounts exploded)
+and lives next to its JSON file as transactions_<week>.parquet. The sidecar
+records the (mtime_ns, size) of the JSON it was built from and is only used
+while the JSON still has exactly that signature.
+
+Build or refresh every sidecar with:
+    python scripts/transaction_sidecar.py [--force]
+"""
+import json
+import os
+from pathlib import Path
+import numpy as np
+from file_cache import file_signature
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # sidecars are an optimisation, JSON still works without pyarrow
+    pa = None
+
+TRANSACTIONS_DIR = Path("transactions")
+
+
+def sidecars_enabled() -> bool:
+    return pa is not None
+
+
+def sidecar_path(json_path) -> Path:
+    return Path(json_path).with_suffix(".parquet")
+
+
+def _source_signature(metadata):
+    """(mtime_ns, size) of the JSON a sidecar was built from, or None for older sidecars."""
+    try:
+        return int(metadata[b"source_mtime_ns"]), int(metadata[b"source_size"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def is_fresh(json_path) -> bool:
+    """True if a sidecar exists and was built from the JSON file as it is now."""
+    sidecar = sidecar_path(json_path)
+    try:
+        if not sidecar.exists():
+            return False
+        return _source_signature(pq.read_schema(sidecar).metadata or {}) == file_signature(json_path)
+    except (OSError, ValueError):
+        return False
+
+
+def _strings(indices, names):
+    dictionary = pa.array(names, type=pa.string())
+    return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), dictionary).cast(pa.string())
+
+
+def write_sidecar(json_path, lines, signature=None):
+    """
+    Write the line items of a WeekLines to the sidecar of json_path. signature:
+    the JSON's (mtime_ns, size) when it was read (default: as it is now).
+    """
+    if signature is None:
+        signature = file_signature(json_path)
+    table = pa.table({
+        "day": pa.array(lines.day, type=pa.int16()),
+        "transaction": pa.array(lines.transaction, type=pa.int32()),
+        "customer_id": _strings(lines.customer, lines.customers),
+        "register_worker": _strings(lines.worker, lines.workers),
+        "customer_sale": pa.array(lines.sale, type=pa.bool_()),
+        "merch_type": _strings(lines.product, lines.products),
+        "merch_amount": pa.array(lines.quantity, type=pa.int64()),
+    })
+    table = table.replace_schema_metadata({
+        "days": json.dumps(lines.days),
+        "n_transactions": str(lines.n_transactions),
+        "source_mtime_ns": str(signature[0]),
+        "source_size": str(signature[1]),
+    })
+
+    target = sidecar_path(json_path)
+    tmp = target.with_name(target.name + ".tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, target)
+
+
+def _encode(column):
+    encoded = pc.dictionary_encode(column.combine_chunks(), null_encoding="encode")
+    return encoded.indices.to_numpy(zero_copy_only=False).astype(np.int32), encoded.dictionary.to_pylist()
+
+
+def read_sidecar(json_path) -> dict:
+    """
+    Read the sidecar of json_path and return the keyword arguments for WeekLines.
+    Name lists come back in first-appearance order, like parse_week_lines.
+    Raises ValueError if the sidecar was not built from the JSON as it is now.
+    """
+    table = pq.read_table(sidecar_path(json_path))
+    metadata = table.schema.metadata or {}
+    if _source_signature(metadata) != file_signature(json_path):
+        raise ValueError(f"stale sidecar for {json_path}")
+
+    product, products = _encode(table.column("merch_type"))
+    worker, workers = _encode(table.column("register_worker"))
+    customer, customers = _encode(table.column("customer_id"))
+
+    return dict(
+        days=json.loads(metadata.get(b"days", b"[]")),
+        n_transactions=int(metadata.get(b"n_transactions", b"0")),
+        products=products,
+        workers=workers,
+        customers=customers,
+        day=table.column("day").to_numpy().astype(np.int16),
+        worker=worker,
+        customer=customer,
+        product=product,
+        quantity=table.column("merch_amount").to_numpy().astype(np.int64),
+        transaction=table.column("transaction").to_numpy().astype(np.int32),
+        sale=table.column("customer_sale").to_numpy(zero_copy_only=False).astype(bool),
+    )
+
+
+def ingest_all(force: bool = False):
+    """Build sidecars for every week whose sidecar is missing or stale."""
+    from transaction_store import parse_week_lines
+
+    built = []
+    for json_path in sorted(TRANSACTIONS_DIR.glob("transactions_*.json")):
+        if not force and is_fresh(json_path):
+            continue
+        signature = file_signature(json_path)
+        with open(json_path, "r", encoding="utf-8") as f:
+            write_sidecar(json_path, parse_week_lines(json.load(f)), signature)
+        built.append(json_path.name)
+    return built
+
+
+if __name__ == "__main__":
+    import sys
+
+    if not sidecars_enabled():
+        print("⚠️ pyarrow is not installed, cannot build sidecars.")
+        sys.exit(1)
+
+    built = ingest_all(force="--force" in sys.argv)
+    if built:
+        print(f"Built {len(built)} sidecar(s): {', '.join(built)}")
+    else:
+        print("All sidecars are up to date.")
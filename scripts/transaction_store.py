@@ -0,0 +1,185 @@
+# transaction_store.py
+import json
+from pathlib import Path
+import numpy as np
+from file_cache import cached, file_signature, peek, store
+import transaction_sidecar
+
+TRANSACTIONS_DIR = Path("transactions")
+
+
+class WeekLines:
+    """
+    One week of transactions flattened into line-item arrays.
+
+    Every line (one merch type inside one transaction) has an entry in the
+    day / worker / customer / product / quantity / transaction arrays.
+    worker, customer and product hold indexes into the matching name lists,
+    which are ordered by first appearance in the file. Transactions without
+    any lines only count towards n_transactions.
+    """
+
+    def __init__(self, days, n_transactions, products, workers, customers,
+                 day, worker, customer, product, quantity, transaction, sale):
+        self.days = days
+        self.n_transactions = n_transactions
+        self.products = products
+        self.workers = workers
+        self.customers = customers
+        self.product_index = {name: i for i, name in enumerate(products)}
+        self.worker_index = {worker_id: i for i, worker_id in enumerate(workers)}
+
+        self.day = day
+        self.worker = worker
+        self.customer = customer
+        self.product = product
+        self.quantity = quantity
+        self.transaction = transaction
+        self.sale = sale
+
+    def worker_mask(self, worker_id):
+        """Boolean line mask for one register worker (all False if unknown)."""
+        index = self.worker_index.get(worker_id)
+        if index is None:
+            return np.zeros(len(self.worker), dtype=bool)
+        return self.worker == index
+
+    def product_totals(self, mask=None):
+        """Units sold per product index, optionally restricted to a line mask."""
+        product, quantity = self.product, self.quantity
+        if mask is not None:
+            product, quantity = product[mask], quantity[mask]
+        return np.bincount(product, weights=quantity, minlength=len(self.products)).astype(np.int64)
+
+    def day_product_matrix(self, mask=None, n_days=8):
+        """Units sold as a products × days matrix, indexed by the raw day number."""
+        n_days = max(n_days, (max(self.days) + 1) if self.days else 0)
+        matrix = np.zeros((len(self.products), n_days), dtype=np.int64)
+        product, day, quantity = self.product, self.day, self.quantity
+        if mask is not None:
+            product, day, quantity = product[mask], day[mask], quantity[mask]
+        np.add.at(matrix, (product, day), quantity)
+        return matrix
+
+    def totals_by_name(self, mask=None):
+        """Dict of product name -> units sold for products with at least one line."""
+        product = self.product if mask is None else self.product[mask]
+        present = np.bincount(product, minlength=len(self.products)) > 0
+        totals = self.product_totals(mask)
+        return {
+            name: int(totals[i])
+            for i, name in enumerate(self.products)
+            if present[i]
+        }
+
+
+def _whole_amounts(amounts):
+    """merch_amounts as int64. Raises ValueError for fractional amounts instead of truncating them."""
+    values = np.array(amounts, dtype=np.float64)
+    invalid = ~np.isfinite(values) | (values != np.floor(values))
+    if invalid.any():
+        raise ValueError(f"merch_amount {float(values[invalid][0])!r} is not a whole number")
+    return values.astype(np.int64)
+
+
+def parse_week_lines(week_data: dict) -> WeekLines:
+    """
+    Flatten a decoded day -> [transaction, ...] dict into a WeekLines. Raises
+    ValueError if a merch_amount is not a whole number.
+    """
+    products, workers, customers = {}, {}, {}
+    day, worker, customer, product, quantity, transaction, sale = [], [], [], [], [], [], []
+
+    days = sorted(int(k) for k in week_data.keys() if str(k).isdigit())
+    n_transactions = 0
+    for d in days:
+        for record in week_data[str(d)]:
+            tx_index = n_transactions
+            n_transactions += 1
+            merch_types = record.get("merch_types", [])
+            merch_amounts = record.get("merch_amounts", [])
+            n_lines = min(len(merch_types), len(merch_amounts))
+            if n_lines == 0:
+                continue
+
+            w = workers.setdefault(record.get("register_worker"), len(workers))
+            c = customers.setdefault(record.get("customer_id"), len(customers))
+            is_sale = record.get("transaction_type") == "customer_sale"
+
+            for merch, amount in zip(merch_types, merch_amounts):
+                product.append(products.setdefault(merch, len(products)))
+                quantity.append(amount)
+            day.extend([d] * n_lines)
+            worker.extend([w] * n_lines)
+            customer.extend([c] * n_lines)
+            transaction.extend([tx_index] * n_lines)
+            sale.extend([is_sale] * n_lines)
+
+    return WeekLines(
+        days=days,
+        n_transactions=n_transactions,
+        products=list(products),
+        workers=list(workers),
+        customers=list(customers),
+        day=np.array(day, dtype=np.int16),
+        worker=np.array(worker, dtype=np.int32),
+        customer=np.array(customer, dtype=np.int32),
+        product=np.array(product, dtype=np.int32),
+        quantity=_whole_amounts(quantity),
+        transaction=np.array(transaction, dtype=np.int32),
+        sale=np.array(sale, dtype=bool),
+    )
+
+
+def _read_week_lines(path):
+    """Read a week from its Parquet sidecar if it is fresh, else decode the JSON."""
+    if not transaction_sidecar.sidecars_enabled():
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_week_lines(json.load(f))
+
+    if transaction_sidecar.is_fresh(path):
+        try:
+            return WeekLines(**transaction_sidecar.read_sidecar(path))
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable sidecar, rebuild it below
+
+    signature = file_signature(path)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = parse_week_lines(json.load(f))
+    try:
+        transaction_sidecar.write_sidecar(path, lines, signature)
+    except OSError:
+        pass  # read-only data folder, keep serving from JSON
+    return lines
+
+
+def load_week_lines(week_number: int) -> WeekLines:
+    """
+    Return the WeekLines for transactions_<week>.json, decoding the file at most
+    once per change on disk. Raises FileNotFoundError if the week is missing.
+    """
+    return load_lines_file(TRANSACTIONS_DIR / f"transactions_{week_number}.json")
+
+
+def load_lines_file(path) -> WeekLines:
+    """load_week_lines() for an explicit transactions file path."""
+    return cached(path, _read_week_lines)
+
+
+def read_lines_file(path):
+    """
+    (signature, WeekLines) for a transactions file, read outside the cache (from
+    its sidecar when fresh); for worker processes, see store_lines_file().
+    """
+    signature = file_signature(path)
+    return signature, _read_week_lines(path)
+
+
+def store_lines_file(path, signature, lines):
+    """Put WeekLines read by read_lines_file() into the cache used by load_lines_file()."""
+    store(path, _read_week_lines, lines, signature)
+
+
+def cached_week_lines(week_number: int):
+    """The WeekLines for a week if they are already cached and fresh, else None."""
+    return peek(TRANSACTIONS_DIR / f"transactions_{week_number}.json", _read_week_lines)
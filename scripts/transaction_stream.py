@@ -0,0 +1,149 @@
+# transaction_stream.py
+"""
+Streaming reader for day-keyed transaction files ({"<day>": [record, ...], ...}).
+
+iter_transactions() reads the file in fixed-size chunks and decodes one
+transaction record at a time, so memory use is bounded by the largest single
+record rather than by the size of the week. The stream_* aggregators build on
+it and only keep one running total per product, day or worker.
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+
+TRANSACTIONS_DIR = Path("transactions")
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Sliding text buffer over a file with JSON token helpers."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more data until it fits."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+
+def iter_transactions(path, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield (day, record) for every transaction in a day-keyed file, in file order.
+    Raises ValueError if the file is not a JSON object of day -> list.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            reader.expect("[")
+            day = int(key) if str(key).isdigit() else key
+
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    record = reader.value()
+                    if isinstance(record, dict):
+                        yield day, record
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                        continue
+                    reader.expect("]")
+                    break
+
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            return
+
+
+def _lines(record):
+    return zip(record.get("merch_types", []), record.get("merch_amounts", []))
+
+
+def stream_sold_totals(path) -> dict:
+    """Units sold per product over the whole file."""
+    totals = defaultdict(int)
+    for _, record in iter_transactions(path):
+        for merch, amount in _lines(record):
+            totals[merch] += amount
+    return dict(totals)
+
+
+def stream_day_totals(path, customer_sales_only: bool = False) -> dict:
+    """Units sold per day key."""
+    totals = defaultdict(int)
+    for day, record in iter_transactions(path):
+        if customer_sales_only and record.get("transaction_type") != "customer_sale":
+            continue
+        for _, amount in _lines(record):
+            totals[day] += amount
+    return dict(totals)
+
+
+def stream_worker_totals(path) -> dict:
+    """Units sold per register worker."""
+    totals = defaultdict(int)
+    for _, record in iter_transactions(path):
+        for _, amount in _lines(record):
+            totals[record.get("register_worker")] += amount
+    return dict(totals)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python transaction_stream.py <week_number>")
+        sys.exit(1)
+
+    week_path = TRANSACTIONS_DIR / f"transactions_{int(sys.argv[1])}.json"
+    for day, total in sorted(stream_day_totals(week_path).items(), key=lambda x: str(x[0])):
+        print(f"Day {day}: {total} units")
@@ -1,102 +1,229 @@
-import os
-import json
+# turn_csv.py
+"""
+Export every input file as CSV (in one zip) or as Parquet files.
+
+    python scripts/turn_csv.py [output.zip]             # CSVs streamed into all_csv_files.zip
+    python scripts/turn_csv.py --parquet [output_dir]   # one .parquet per file in all_parquet_files/
+
+Every kind of file has a fixed schema (EXPORT_SCHEMAS), so columns keep the
+same names and order between runs. Transaction line items are flattened to one
+row per product; a transaction without lines gets one row with empty product
+columns. Rows are produced one at a time from the source file and written as
+they are produced, so memory stays bounded by a batch, not by the history.
+
+Files are converted on DASHBOARD_WORKERS processes (default: all CPUs). For a
+zip, each process writes its CSV to a temporary file that is copied into the
+archive and deleted as soon as it is done; with one worker rows go straight
+into the archive.
+"""
 import csv
+import io
+import os
+import shutil
+import tempfile
 import zipfile
-from glob import glob
-
-# --- Folders ---
-folders = {
-    "amounts": "amounts",
-    "prices": "prices",
-    "schedules": "schedules",
-    "transactions": "transactions",
-    "workers": "workers",
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from dataset import SUPPLIER_FILE, WEEKLY_FOLDERS, WORKERS_FILE, available_weeks, weekly_file
+from file_cache import load_json
+from transaction_stream import iter_transactions
+from week_executor import resolve_workers
+from worker_registry import parse_workers
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for --parquet
+    pa = None
+
+OUTPUT_ZIP = Path("all_csv_files.zip")
+OUTPUT_PARQUET_DIR = Path("all_parquet_files")
+BATCH_ROWS = 65536
+
+# kind -> [(column, type)], type being one of "int", "float", "str"
+EXPORT_SCHEMAS = {
+    "transactions": [
+        ("week", "int"), ("day", "int"), ("transaction", "int"), ("customer_id", "str"),
+        ("register_worker", "str"), ("transaction_type", "str"), ("merch_type", "str"), ("merch_amount", "int"),
+    ],
+    "amounts": [("week", "int"), ("product", "str"), ("stock", "float")],
+    "prices": [("week", "int"), ("product", "str"), ("price", "float")],
+    "schedules": [("week", "int"), ("day", "str"), ("worker_id", "str"), ("department", "str"), ("shift", "int")],
+    "supplier_prices": [("product", "str"), ("price", "float")],
+    "workers": [("worker_id", "str"), ("name", "str"), ("age", "int"), ("salary", "float")],
+}
+
+# ---------------------------------------------------------------------
+# Row producers: one generator of schema-ordered tuples per kind
+# ---------------------------------------------------------------------
+def _transaction_rows(path, week):
+    for seq, (day, record) in enumerate(iter_transactions(path)):
+        if not isinstance(day, int):
+            continue  # not a day key, as in transaction_store
+        head = (week, day, seq, record.get("customer_id"), record.get("register_worker"), record.get("transaction_type"))
+        lines = list(zip(record.get("merch_types", []), record.get("merch_amounts", [])))
+        if not lines:
+            yield head + (None, None)
+        for merch, amount in lines:
+            yield head + (merch, amount)
+
+
+def _mapping_rows(path, week):
+    for product, value in load_json(path).items():
+        yield week, product, value
+
+
+def _schedule_rows(path, week):
+    for day, day_schedule in load_json(path).items():
+        for shift in day_schedule:
+            yield week, day.lower(), shift.get("worker_id"), shift.get("department"), shift.get("shift")
+
+
+def _supplier_rows(path, week):
+    yield from load_json(path).items()
+
+
+def _worker_rows(path, week):
+    registry = parse_workers(path)
+    for record, salary in zip(registry.records, registry.salaries.tolist()):
+        yield record["worker_id"], record.get("name"), record.get("age"), salary
+
+
+ROW_PRODUCERS = {
+    "transactions": _transaction_rows,
+    "amounts": _mapping_rows,
+    "prices": _mapping_rows,
+    "schedules": _schedule_rows,
+    "supplier_prices": _supplier_rows,
+    "workers": _worker_rows,
 }
-single_files = ["supplier_prices.json"]  # single JSON files in root
-
-output_zip = "all_csv_files.zip"
-
-def json_to_csv(json_path, csv_path):
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    # Handle dictionary of lists (like transactions or schedules)
-    if isinstance(data, dict):
-        # Convert dict of lists into rows
-        rows = []
-        # Check if inner elements are dicts
-        for key, value in data.items():
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, dict):
-                        row = {"key": key, **item}
-                        rows.append(row)
-                    else:
-                        rows.append({"key": key, "value": item})
-            else:
-                rows.append({"key": key, "value": value})
-    elif isinstance(data, list):
-        # list of dicts
-        rows = data
+
+
+def export_tasks():
+    """[(kind, source path, week, output stem)] for every input file, in a stable order."""
+    tasks = []
+    for kind, folder in WEEKLY_FOLDERS.items():
+        for week in available_weeks(kind):
+            path = weekly_file(kind, week)
+            tasks.append((kind, str(path), week, f"{folder.name}/{path.stem}"))
+    for kind, path in (("supplier_prices", SUPPLIER_FILE), ("workers", WORKERS_FILE)):
+        if path.exists():
+            tasks.append((kind, str(path), None, str(path.with_suffix(""))))
+    return tasks
+
+
+def _rows(task):
+    kind, path, week, _ = task
+    return ROW_PRODUCERS[kind](path, week)
+
+
+def _header(kind):
+    return [column for column, _ in EXPORT_SCHEMAS[kind]]
+
+
+# ---------------------------------------------------------------------
+# CSV → zip
+# ---------------------------------------------------------------------
+def _write_csv(task, f):
+    writer = csv.writer(f)
+    writer.writerow(_header(task[0]))
+    writer.writerows(_rows(task))
+
+
+def _csv_to_temp(task, temp_dir):
+    """Write one task's CSV to a temporary file and return its path (runs in a worker process)."""
+    fd, temp_path = tempfile.mkstemp(suffix=".csv", dir=temp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        _write_csv(task, f)
+    return temp_path
+
+
+def export_zip(output=OUTPUT_ZIP, max_workers=None):
+    """Write every input file as CSV into one zip; returns the number of files."""
+    tasks = export_tasks()
+    workers = min(resolve_workers(max_workers), max(1, len(tasks)))
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zf:
+        if workers == 1:
+            for task in tasks:
+                with zf.open(f"{task[3]}.csv", "w", force_zip64=True) as raw:
+                    with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                        _write_csv(task, f)
+            return len(tasks)
+
+        temp_dir = tempfile.mkdtemp(prefix="turn_csv_")
+        try:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(_csv_to_temp, task, temp_dir) for task in tasks]
+                # Archive in task order; each temp file is removed as soon as it is copied
+                for task, future in zip(tasks, futures):
+                    temp_path = future.result()
+                    with open(temp_path, "rb") as src, zf.open(f"{task[3]}.csv", "w", force_zip64=True) as dst:
+                        shutil.copyfileobj(src, dst, 1 << 20)
+                    os.remove(temp_path)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return len(tasks)
+
+
+# ---------------------------------------------------------------------
+# Parquet
+# ---------------------------------------------------------------------
+def _arrow_schema(kind):
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+    return pa.schema([(column, types[kind_type]) for column, kind_type in EXPORT_SCHEMAS[kind]])
+
+
+def _write_parquet(task, output_dir):
+    """Write one task as a Parquet file in batches of BATCH_ROWS rows (runs in a worker process)."""
+    kind = task[0]
+    schema = _arrow_schema(kind)
+    target = Path(output_dir) / f"{task[3]}.parquet"
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    def flush(writer, batch):
+        columns = list(zip(*batch))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+        ))
+
+    with pq.ParquetWriter(target, schema) as writer:
+        batch = []
+        for row in _rows(task):
+            batch.append(row)
+            if len(batch) >= BATCH_ROWS:
+                flush(writer, batch)
+                batch = []
+        if batch:
+            flush(writer, batch)
+    return str(target)
+
+
+def export_parquet(output_dir=OUTPUT_PARQUET_DIR, max_workers=None):
+    """Write every input file as a Parquet file under output_dir; returns the number of files."""
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    tasks = export_tasks()
+    workers = min(resolve_workers(max_workers), max(1, len(tasks)))
+    if workers == 1:
+        for task in tasks:
+            _write_parquet(task, output_dir)
     else:
-        # single value
-        rows = [{"value": data}]
-
-    # Determine CSV headers
-    headers = set()
-    for row in rows:
-        headers.update(row.keys())
-    headers = list(headers)
-
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(rows)
-
-def jsonl_to_csv(jsonl_path, csv_path):
-    rows = []
-    with open(jsonl_path, "r") as f:
-        for line in f:
-            rows.append(json.loads(line))
-
-    headers = set()
-    for row in rows:
-        headers.update(row.keys())
-    headers = list(headers)
-
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(rows)
-
-# Create a temp folder to hold CSV files
-import tempfile
-temp_dir = tempfile.mkdtemp()
-
-# Convert folder files
-for folder, path in folders.items():
-    files = glob(os.path.join(path, "*.json")) + glob(os.path.join(path, "*.jsonl"))
-    for file in files:
-        rel_path = os.path.relpath(file)  # keep folder structure
-        csv_path = os.path.join(temp_dir, os.path.splitext(rel_path)[0] + ".csv")
-        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-
-        if file.endswith(".jsonl"):
-            jsonl_to_csv(file, csv_path)
-        else:
-            json_to_csv(file, csv_path)
-
-# Convert single JSON files in root
-for file in single_files:
-    csv_path = os.path.join(temp_dir, os.path.splitext(file)[0] + ".csv")
-    json_to_csv(file, csv_path)
-
-# --- Create ZIP ---
-with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
-    for root, dirs, files in os.walk(temp_dir):
-        for file in files:
-            abs_path = os.path.join(root, file)
-            rel_path = os.path.relpath(abs_path, temp_dir)  # preserve folder structure
-            zipf.write(abs_path, rel_path)
-
-print(f"All CSV files packed into {output_zip}")
+        with ProcessPoolExecutor(workers) as pool:
+            list(pool.map(_write_parquet, tasks, [output_dir] * len(tasks)))
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    started = time.perf_counter()
+    if "--parquet" in sys.argv:
+        output = Path(args[0]) if args else OUTPUT_PARQUET_DIR
+        count = export_parquet(output)
+        print(f"{count} files written as Parquet to {output}/ in {time.perf_counter() - started:.2f}s")
+    else:
+        output = Path(args[0]) if args else OUTPUT_ZIP
+        count = export_zip(output)
+        print(f"All CSV files packed into {output} ({count} files, {time.perf_counter() - started:.2f}s)")
@@ -0,0 +1,250 @@
+# warehouse.py
+"""
+Local SQLite warehouse of every input file.
+
+Running this module ingests transactions (one row per transaction plus one per
+line item), amounts, prices, supplier prices, schedules and workers into
+WAREHOUSE_FILE (DASHBOARD_WAREHOUSE, default warehouse.sqlite). Every ingested
+file is recorded with its (mtime_ns, size) signature, so a re-run only reloads
+files that were added or changed and drops the rows of files that were removed.
+Line items carry their week, day, worker and customer so the aggregates in
+warehouse_query are answered from indexes without joins.
+
+    python scripts/warehouse.py            # ingest changed files
+    python scripts/warehouse.py --rebuild  # drop everything and ingest again
+"""
+import os
+import sqlite3
+from pathlib import Path
+from dataset import SUPPLIER_FILE, WORKERS_FILE, available_weeks, weekly_file
+from file_cache import file_signature, load_json
+from transaction_stream import iter_transactions
+from worker_registry import parse_workers
+
+WAREHOUSE_FILE = Path(os.environ.get("DASHBOARD_WAREHOUSE", "warehouse.sqlite"))
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, kind TEXT NOT NULL, week INTEGER,
+    mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    week INTEGER NOT NULL, seq INTEGER NOT NULL, day INTEGER NOT NULL,
+    customer_id TEXT, worker_id TEXT, transaction_type TEXT,
+    PRIMARY KEY (week, seq)
+);
+CREATE TABLE IF NOT EXISTS line_items (
+    week INTEGER NOT NULL, seq INTEGER NOT NULL, day INTEGER NOT NULL,
+    product TEXT NOT NULL, quantity INTEGER NOT NULL,
+    worker_id TEXT, customer_id TEXT, sale INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS amounts (
+    week INTEGER NOT NULL, product TEXT NOT NULL, stock REAL NOT NULL,
+    PRIMARY KEY (week, product)
+);
+CREATE TABLE IF NOT EXISTS prices (
+    week INTEGER NOT NULL, product TEXT NOT NULL, price REAL NOT NULL,
+    PRIMARY KEY (week, product)
+);
+CREATE TABLE IF NOT EXISTS supplier_prices (
+    product TEXT PRIMARY KEY, price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    week INTEGER NOT NULL, day TEXT NOT NULL, worker_id TEXT NOT NULL,
+    department TEXT, shift INTEGER
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY, name TEXT, age INTEGER, salary REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS transactions_day ON transactions (week, day);
+CREATE INDEX IF NOT EXISTS transactions_worker ON transactions (worker_id, week);
+CREATE INDEX IF NOT EXISTS transactions_customer ON transactions (customer_id, week);
+CREATE INDEX IF NOT EXISTS line_items_week_day ON line_items (week, day, product);
+CREATE INDEX IF NOT EXISTS line_items_product ON line_items (product, week);
+CREATE INDEX IF NOT EXISTS line_items_worker ON line_items (worker_id, week);
+CREATE INDEX IF NOT EXISTS line_items_customer ON line_items (customer_id, week);
+CREATE INDEX IF NOT EXISTS prices_product ON prices (product, week);
+CREATE INDEX IF NOT EXISTS schedules_week ON schedules (week, worker_id);
+CREATE INDEX IF NOT EXISTS schedules_worker ON schedules (worker_id, week);
+"""
+
+# Tables filled from each kind of file; weekly kinds are replaced one week at a time
+WEEKLY_TABLES = {
+    "transactions": ("transactions", "line_items"),
+    "amounts": ("amounts",),
+    "prices": ("prices",),
+    "schedules": ("schedules",),
+}
+SHARED_TABLES = {"supplier_prices": ("supplier_prices",), "workers": ("workers",)}
+
+
+def connect(path=WAREHOUSE_FILE) -> sqlite3.Connection:
+    """Open the warehouse, creating the schema (or recreating it after a schema change)."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        _drop_all(conn)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def _drop_all(conn):
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    for table in tables:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+# ---------------------------------------------------------------------
+# Loaders: one per kind of file, inserting its rows
+# ---------------------------------------------------------------------
+def _load_transactions(conn, path, week):
+    seq = 0
+    transactions, lines = [], []
+    for day, record in iter_transactions(path):
+        if not isinstance(day, int):
+            continue
+        worker_id = record.get("register_worker")
+        customer_id = record.get("customer_id")
+        transaction_type = record.get("transaction_type")
+        transactions.append((week, seq, day, customer_id, worker_id, transaction_type))
+        sale = int(transaction_type == "customer_sale")
+        for merch, amount in zip(record.get("merch_types", []), record.get("merch_amounts", [])):
+            lines.append((week, seq, day, merch, amount, worker_id, customer_id, sale))
+        seq += 1
+    conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", transactions)
+    conn.executemany("INSERT INTO line_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", lines)
+
+
+def _load_amounts(conn, path, week):
+    rows = [(week, product, stock) for product, stock in load_json(path).items()]
+    conn.executemany("INSERT INTO amounts VALUES (?, ?, ?)", rows)
+
+
+def _load_prices(conn, path, week):
+    rows = [(week, product, price) for product, price in load_json(path).items()]
+    conn.executemany("INSERT INTO prices VALUES (?, ?, ?)", rows)
+
+
+def _load_schedules(conn, path, week):
+    rows = [
+        (week, day.lower(), shift["worker_id"], shift.get("department"), shift.get("shift"))
+        for day, day_schedule in load_json(path).items()
+        for shift in day_schedule
+        if "worker_id" in shift
+    ]
+    conn.executemany("INSERT INTO schedules VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def _load_supplier_prices(conn, path, week):
+    conn.executemany("INSERT INTO supplier_prices VALUES (?, ?)", load_json(path).items())
+
+
+def _load_workers(conn, path, week):
+    registry = parse_workers(path)
+    rows = [
+        (r["worker_id"], r.get("name"), r.get("age"), float(salary))
+        for r, salary in zip(registry.records, registry.salaries)
+    ]
+    conn.executemany("INSERT INTO workers VALUES (?, ?, ?, ?)", rows)
+
+
+LOADERS = {
+    "transactions": _load_transactions,
+    "amounts": _load_amounts,
+    "prices": _load_prices,
+    "schedules": _load_schedules,
+    "supplier_prices": _load_supplier_prices,
+    "workers": _load_workers,
+}
+
+
+def _source_files():
+    """{path: (kind, week)} for every input file on disk."""
+    files = {}
+    for kind in WEEKLY_TABLES:
+        for week in available_weeks(kind):
+            files[str(weekly_file(kind, week))] = (kind, week)
+    for kind, path in (("supplier_prices", SUPPLIER_FILE), ("workers", WORKERS_FILE)):
+        if path.exists():
+            files[str(path)] = (kind, None)
+    return files
+
+
+def _delete_rows(conn, kind, week):
+    for table in WEEKLY_TABLES.get(kind) or SHARED_TABLES[kind]:
+        if week is None:
+            conn.execute(f"DELETE FROM {table}")
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE week = ?", (week,))
+
+
+def ingest(conn=None, rebuild: bool = False, verbose: bool = False):
+    """
+    Bring the warehouse up to date with the input files and return
+    (loaded, removed): the paths that were (re)loaded and the paths dropped.
+    Each file is replaced in its own transaction; a file that fails to parse
+    keeps its previous rows and is retried on the next run.
+    """
+    own = conn is None
+    conn = conn or connect()
+    try:
+        if rebuild:
+            _drop_all(conn)
+            conn.executescript(SCHEMA)
+
+        known = {
+            path: (kind, week, (mtime_ns, size))
+            for path, kind, week, mtime_ns, size in conn.execute("SELECT path, kind, week, mtime_ns, size FROM files")
+        }
+        sources = _source_files()
+
+        removed = []
+        for path in sorted(set(known) - set(sources)):
+            kind, week, _ = known[path]
+            with conn:
+                _delete_rows(conn, kind, week)
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            removed.append(path)
+
+        loaded = []
+        for path, (kind, week) in sources.items():
+            try:
+                signature = file_signature(path)
+            except FileNotFoundError:
+                continue
+            if path in known and known[path][2] == signature:
+                continue
+            try:
+                with conn:
+                    _delete_rows(conn, kind, week)
+                    LOADERS[kind](conn, path, week)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                        (path, kind, week, *signature),
+                    )
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"⚠️ Could not ingest {path}: {e}")
+                continue
+            loaded.append(path)
+            if verbose:
+                print(f"Ingested {path}")
+        return loaded, removed
+    finally:
+        if own:
+            conn.close()
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    started = time.perf_counter()
+    loaded, removed = ingest(rebuild="--rebuild" in sys.argv, verbose=True)
+    for path in removed:
+        print(f"Removed {path}")
+    print(f"{len(loaded)} file(s) ingested, {len(removed)} removed in {time.perf_counter() - started:.2f}s "
+          f"→ {WAREHOUSE_FILE}")
@@ -0,0 +1,162 @@
+# warehouse_query.py
+"""
+Aggregates over the SQLite warehouse (see warehouse.py).
+
+Each function takes an optional open connection and otherwise opens
+WAREHOUSE_FILE for the duration of the call. Results use the same shapes as
+the JSON-based helpers (product name -> units, week -> value, ...), so a
+script can switch source without changing its chart code. Run the module with
+a SQL statement to answer ad-hoc questions:
+
+    python scripts/warehouse_query.py "SELECT product, SUM(quantity) FROM line_items GROUP BY product"
+"""
+from contextlib import contextmanager
+from warehouse import WAREHOUSE_FILE, connect
+
+
+@contextmanager
+def _connection(conn=None):
+    if conn is not None:
+        yield conn
+        return
+    conn = connect(WAREHOUSE_FILE)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def query(sql, params=(), conn=None):
+    """Rows of an arbitrary SQL statement."""
+    with _connection(conn) as c:
+        return c.execute(sql, params).fetchall()
+
+
+def weeks(kind: str = "transactions", conn=None):
+    """Sorted week numbers ingested for a kind of weekly file."""
+    rows = query("SELECT week FROM files WHERE kind = ? ORDER BY week", (kind,), conn)
+    return [week for (week,) in rows]
+
+
+def product_totals(week, sales_only: bool = False, worker_id=None, conn=None):
+    """product name -> units in a week, optionally customer sales only or for one register worker."""
+    sql = "SELECT product, SUM(quantity) FROM line_items WHERE week = ?"
+    params = [week]
+    if sales_only:
+        sql += " AND sale = 1"
+    if worker_id is not None:
+        sql += " AND worker_id = ?"
+        params.append(worker_id)
+    return dict(query(sql + " GROUP BY product", params, conn))
+
+
+def day_product(week, sales_only: bool = False, conn=None):
+    """day -> {product name -> units} for a week."""
+    sql = "SELECT day, product, SUM(quantity) FROM line_items WHERE week = ?"
+    if sales_only:
+        sql += " AND sale = 1"
+    result = {}
+    for day, product, units in query(sql + " GROUP BY day, product", (week,), conn):
+        result.setdefault(day, {})[product] = units
+    return result
+
+
+def worker_product(week, conn=None):
+    """worker_id -> {product name -> units} for a week."""
+    result = {}
+    rows = query(
+        "SELECT worker_id, product, SUM(quantity) FROM line_items WHERE week = ? GROUP BY worker_id, product",
+        (week,),
+        conn,
+    )
+    for worker_id, product, units in rows:
+        result.setdefault(worker_id, {})[product] = units
+    return result
+
+
+def stock(week, conn=None):
+    """product name -> stock units for a week."""
+    return dict(query("SELECT product, stock FROM amounts WHERE week = ?", (week,), conn))
+
+
+def prices(week, conn=None):
+    """product name -> retail price for a week."""
+    return dict(query("SELECT product, price FROM prices WHERE week = ?", (week,), conn))
+
+
+def weekly_sales_volume(conn=None):
+    """week -> units sold to customers on days 1-7."""
+    return dict(query(
+        "SELECT week, SUM(quantity) FROM line_items WHERE sale = 1 AND day BETWEEN 1 AND 7 GROUP BY week",
+        conn=conn,
+    ))
+
+
+def weekly_salary(conn=None):
+    """week -> salary of every worker scheduled at least once that week."""
+    return dict(query(
+        """
+        SELECT s.week, SUM(w.salary)
+        FROM (SELECT DISTINCT week, worker_id FROM schedules) AS s
+        JOIN workers AS w USING (worker_id)
+        GROUP BY s.week
+        """,
+        conn=conn,
+    ))
+
+
+def weekly_ledger(conn=None):
+    """
+    [(week, revenue, cogs, salary, net), ...] with the ledger's rules: revenue counts
+    only products in the week's stock file, at the product's latest price up to
+    that week (as price_timeline forward-fills it), and weeks without a
+    transactions, prices or amounts file have a net of 0.
+    """
+    with _connection(conn) as c:
+        revenue = dict(c.execute(
+            """
+            SELECT a.week, SUM(COALESCE(sold.units, 0) * COALESCE(p.price, 0))
+            FROM amounts AS a
+            LEFT JOIN (SELECT week, product, SUM(quantity) AS units FROM line_items GROUP BY week, product) AS sold
+                ON sold.week = a.week AND sold.product = a.product
+            LEFT JOIN prices AS p ON p.product = a.product AND p.week = (
+                SELECT MAX(week) FROM prices WHERE product = a.product AND week <= a.week
+            )
+            GROUP BY a.week
+            """
+        ).fetchall())
+        cogs = dict(c.execute(
+            """
+            SELECT a.week, SUM(a.stock * COALESCE(sp.price, 0))
+            FROM amounts AS a LEFT JOIN supplier_prices AS sp USING (product)
+            GROUP BY a.week
+            """
+        ).fetchall())
+        salary = weekly_salary(c)
+        complete = {
+            week for (week,) in c.execute(
+                "SELECT week FROM files WHERE week IS NOT NULL AND kind IN ('transactions', 'prices', 'amounts') "
+                "GROUP BY week HAVING COUNT(DISTINCT kind) = 3"
+            )
+        }
+        rows = []
+        for week in weeks("transactions", c):
+            if week not in complete:
+                rows.append((week, 0.0, 0.0, 0.0, 0.0))
+                continue
+            r, g, s = revenue.get(week, 0.0), cogs.get(week, 0.0), salary.get(week, 0.0)
+            rows.append((week, r, g, s, r - g - s))
+        return rows
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        for row in query(sys.argv[1]):
+            print(*row, sep="\t")
+    else:
+        print(f"{'Week':<6} {'Revenue':>14} {'COGS':>14} {'Salary':>12} {'Net':>14}")
+        print("-" * 64)
+        for week, revenue, cogs, salary, net in weekly_ledger():
+            print(f"{week:<6} {revenue:>14,.2f} {cogs:>14,.2f} {salary:>12,.2f} {net:>14,.2f}")
@@ -0,0 +1,115 @@
+# week_aggregate.py
+"""
+Every weekly-tab metric for one week from a single pass over its line items.
+
+WeekAggregate bins all lines of a week into one (sale flag, day, product,
+worker) units array with a single bincount; product totals, the day × product
+matrix, the worker × product matrix and the sales-rate inputs are sums over
+its axes. Receipt/line counts and basket sizes come from the same lines.
+The weekly generators accept a WeekAggregate so the dashboard builds it once
+per week and shares it between all of its charts.
+"""
+import numpy as np
+from dataset import weekly_file
+from file_cache import cached
+from transaction_store import WeekLines, load_lines_file
+
+N_DAYS = 8  # day numbers are used directly as the day index (0-7)
+
+
+class WeekAggregate:
+    """
+    units[s, d, p, k]: units of products[p] sold on day d by workers[k];
+    s is 1 for customer sales and 0 for other transaction types.
+    days: day numbers present in the file. present[p]: products[p] has at least one line.
+    basket_lines / basket_units: lines and units per receipt, for receipts with lines.
+    """
+
+    def __init__(self, lines: WeekLines):
+        self.days = list(lines.days)
+        self.products = lines.products
+        self.workers = lines.workers
+        self.product_index = lines.product_index
+        self.worker_index = lines.worker_index
+
+        n_days = max([N_DAYS] + [d + 1 for d in self.days])
+        shape = (2, n_days, len(self.products), len(self.workers))
+        flat = np.ravel_multi_index(
+            (lines.sale.astype(np.intp), lines.day, lines.product, lines.worker), shape
+        )
+        size = int(np.prod(shape))
+        self.units = np.bincount(flat, weights=lines.quantity, minlength=size).reshape(shape).astype(np.int64)
+        self.present = np.bincount(lines.product, minlength=len(self.products)) > 0
+
+        self.n_receipts = lines.n_transactions
+        self.n_lines = len(lines.product)
+        per_receipt = np.bincount(lines.transaction, minlength=lines.n_transactions)
+        has_lines = per_receipt > 0
+        self.basket_lines = per_receipt[has_lines]
+        self.basket_units = np.bincount(
+            lines.transaction, weights=lines.quantity, minlength=lines.n_transactions
+        )[has_lines].astype(np.int64)
+
+    @property
+    def n_baskets(self) -> int:
+        return len(self.basket_lines)
+
+    def product_totals(self):
+        """Units per product over all lines."""
+        return self.units.sum(axis=(0, 1, 3))
+
+    def totals_by_name(self):
+        """Dict of product name -> units for products with at least one line, in file order."""
+        totals = self.product_totals()
+        return {name: int(totals[p]) for p, name in enumerate(self.products) if self.present[p]}
+
+    def day_product(self, sales_only: bool = False):
+        """days × products units, indexed by the raw day number."""
+        units = self.units[1] if sales_only else self.units.sum(axis=0)
+        return units.sum(axis=2)
+
+    def cumulative_by_day(self):
+        """days × products running total of units over the week."""
+        return self.day_product().cumsum(axis=0)
+
+    def daily_sales_by_product(self):
+        """product name -> customer-sale units on days 1-7."""
+        daily = self.day_product(sales_only=True)[1:8].T
+        return {name: daily[p].tolist() for p, name in enumerate(self.products)}
+
+    def worker_product(self):
+        """workers × products units."""
+        return self.units.sum(axis=(0, 1)).T
+
+    def worker_products(self, worker_id=None):
+        """Units per product for one worker (all workers if worker_id is None)."""
+        if worker_id is None:
+            return self.product_totals()
+        k = self.worker_index.get(worker_id)
+        if k is None:
+            return np.zeros(len(self.products), dtype=np.int64)
+        return self.units[:, :, :, k].sum(axis=(0, 1))
+
+
+def _aggregate_file(path) -> WeekAggregate:
+    return WeekAggregate(load_lines_file(path))
+
+
+def get_week_aggregate(week_number: int) -> WeekAggregate:
+    """Cached WeekAggregate for a week. Raises FileNotFoundError if the week is missing."""
+    return cached(weekly_file("transactions", week_number), _aggregate_file)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python week_aggregate.py <week_number>")
+        sys.exit(1)
+
+    agg = get_week_aggregate(int(sys.argv[1]))
+    print(f"Receipts: {agg.n_receipts}, lines: {agg.n_lines}, units: {int(agg.units.sum())}")
+    if agg.n_baskets:
+        print(f"Basket size: {agg.basket_lines.mean():.2f} lines, {agg.basket_units.mean():.2f} units on average")
+    for name, units in sorted(agg.totals_by_name().items(), key=lambda x: -x[1]):
+        print(f"  {name:<30} {units:>8}")
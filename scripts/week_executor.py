@@ -0,0 +1,106 @@
+# week_executor.py
+"""
+Week-parallel execution for the Total view.
+
+map_weeks(aggregate, weeks) returns aggregate(WeekLines) for every week, in
+week order. Weeks already in the transaction cache, and weeks with a fresh
+Parquet sidecar, are loaded and aggregated in place. Only weeks that need a
+full JSON decode go to a process pool; the decoded WeekLines come back and are
+stored in the transaction cache (and their sidecars written), so the next
+caller finds them warm.
+
+The process pool is created once and reused by every call. Its workers are
+started from a fork server, so the threaded Dash server never forks itself.
+The worker count defaults to DASHBOARD_WORKERS, or the number of CPUs.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataset import weekly_file
+from transaction_store import cached_week_lines, load_lines_file, read_lines_file, store_lines_file
+import transaction_sidecar
+
+DEFAULT_WORKERS = int(os.environ.get("DASHBOARD_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_workers = 0
+
+
+def resolve_workers(max_workers=None) -> int:
+    return max(1, max_workers or DEFAULT_WORKERS)
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """The shared decode pool, grown (replaced) if more workers are asked for than it has."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)  # running decodes still finish
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["transaction_store"])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def _needs_decode(path) -> bool:
+    """True if reading path means decoding its JSON (no fresh sidecar to read instead)."""
+    return not (transaction_sidecar.sidecars_enabled() and transaction_sidecar.is_fresh(path))
+
+
+def map_weeks(aggregate, weeks, max_workers=None):
+    """[aggregate(lines of week) for week in weeks], with None for weeks without a transactions file."""
+    workers = resolve_workers(max_workers)
+    results = [None] * len(weeks)
+
+    decode = []
+    for i, week in enumerate(weeks):
+        lines = cached_week_lines(week)
+        if lines is not None:
+            results[i] = aggregate(lines)
+            continue
+        path = weekly_file("transactions", week)
+        if not path.exists():
+            continue
+        if workers > 1 and _needs_decode(path):
+            decode.append(i)
+            continue
+        try:
+            results[i] = aggregate(load_lines_file(path))
+        except FileNotFoundError:
+            pass
+
+    if len(decode) < 2:
+        for i in decode:
+            try:
+                results[i] = aggregate(load_lines_file(weekly_file("transactions", weeks[i])))
+            except FileNotFoundError:
+                pass
+        return results
+
+    pool = _process_pool(min(workers, len(decode)))
+    paths = {i: weekly_file("transactions", weeks[i]) for i in decode}
+    futures = {i: pool.submit(read_lines_file, path) for i, path in paths.items()}
+    for i, future in futures.items():
+        try:
+            signature, lines = future.result()
+        except FileNotFoundError:
+            continue
+        store_lines_file(paths[i], signature, lines)
+        results[i] = aggregate(lines)
+    return results
+
+
+def thread_map(func, weeks, max_workers=None):
+    """[func(week) for week in weeks] on a thread pool, for per-week work that is mostly small file reads."""
+    workers = resolve_workers(max_workers)
+    if workers == 1 or len(weeks) < 2:
+        return [func(week) for week in weeks]
+    with ThreadPoolExecutor(min(workers, len(weeks))) as pool:
+        return list(pool.map(func, weeks))
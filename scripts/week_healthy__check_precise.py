@@ -7,6 +7,9 @@
 from pathlib import Path
 import sys, json
 from collections import Counter
+from price_timeline import build_price_timeline
+from product_bitmap import bitmap_from_receipts
+from record_layout import extract_record
 
 # ===== FINN DATAMAPPEN (prosjektroten) =====
 HERE = Path(__file__).resolve()
@@ -51,70 +54,15 @@ def pick_top_layer(data):
     return [], None
 
 def extract_lines(rec):
-    """Streng prioritet: bruk KUN første strukturen som finnes i posten."""
-    items = rec.get("items") or rec.get("products")
-    if isinstance(items, list) and items and isinstance(items[0], dict):
-        for it in items:
-            name = it.get("item") or it.get("name") or it.get("product")
-            qty  = it.get("qty") or it.get("quantity") or it.get("amount") or 1
-            if name is not None:
-                try:
-                    yield str(name), float(qty)
-                except:
-                    pass
-        return
-    mt, ma = rec.get("merch_types"), rec.get("merch_amounts")
-    if isinstance(mt, list) and isinstance(ma, list) and len(mt) == len(ma):
-        for n, q in zip(mt, ma):
-            if n is not None:
-                try:
-                    yield str(n), float(q)
-                except:
-                    pass
-        return
-    mk, ma2 = rec.get("merch_keys"), rec.get("merch_amounts")
-    if isinstance(mk, list) and isinstance(ma2, list) and len(mk) == len(ma2):
-        for n, q in zip(mk, ma2):
-            if n is not None:
-                try:
-                    yield str(n), float(q)
-                except:
-                    pass
-        return
-    merch = rec.get("merch")
-    if isinstance(merch, dict):
-        for n, q in merch.items():
-            if n is not None:
-                try:
-                    yield str(n), float(q if q is not None else 1)
-                except:
-                    pass
-        return
-    if isinstance(merch, list):
-        for n in merch:
-            if n is not None:
-                yield str(n), 1.0
+    """Streng prioritet: bruk KUN første strukturen som finnes i posten (se record_layout)."""
+    return extract_record(rec)
 
 def load_prices_latest():
-    """Hent siste kjente pris per vare (for omsetningsestimat)."""
-    prices_dir = BASE / "prices"
-    latest = {}
-    if prices_dir.exists():
-        for p in sorted(prices_dir.glob("prices_*.json")):
-            try:
-                data = jload(p)
-                for k, v in data.items():
-                    try:
-                        latest[str(k)] = float(v)
-                    except:
-                        pass
-            except:
-                pass
-    sp = BASE / "supplier_prices.json"
-    if sp.exists():
-        data = jload(sp)
-        for k, v in data.items():
-            latest.setdefault(str(k), float(v) if v is not None else 0.0)
+    """Hent siste kjente pris per vare (for omsetningsestimat); uker sorteres numerisk, innkjøpspris som reserve."""
+    timeline = build_price_timeline(BASE / "prices", BASE / "supplier_prices.json")
+    latest = timeline.latest()
+    for k, v in timeline.supplier.items():
+        latest.setdefault(k, v)
     return latest
 
 # ---------- SCHEDULES (robust parser) ----------
@@ -220,15 +168,6 @@ def main():
         except Exception:
             pass
 
-    def record_includes_specified_products(rec):
-        """Returner True hvis kvitteringen inneholder minst ett spesifisert produkt."""
-        if not include_products:
-            return True  # ingen filter aktivert
-        for item, _ in extract_lines(rec):
-            if any(p in item.lower() for p in include_products):
-                return True
-        return False
-
     records, day_keys_present = pick_top_layer(data)
 
     # per-dag aggregering
@@ -236,32 +175,28 @@ def main():
     prices = load_prices_latest()
 
     if day_keys_present:  # eksplisitte dag-lister
-        for d in day_keys_present:
-            for rec in data[str(d)]:
-                if not isinstance(rec, dict) or not record_includes_specified_products(rec):
-                    continue
-
-                line_count = 0
-                for item, qty in extract_lines(rec):
-                    per_day[d]["qty"] += qty
-                    per_day[d]["revenue"] += qty * prices.get(item, 0.0)
-                    line_count += 1
-                per_day[d]["lines"] += line_count
-                if line_count > 0:
-                    per_day[d]["receipts"] += 1
+        day_records = [(d, rec) for d in day_keys_present for rec in data[str(d)]]
     else:  # ingen dag-nøkler → legg i "0"
         per_day = {0: {"receipts": 0, "lines": 0, "qty": 0.0, "revenue": 0.0}}
-        for rec in records or not record_includes_specified_products(rec):
-            if not isinstance(rec, dict):
-                continue
-            line_count = 0
-            for item, qty in extract_lines(rec):
-                per_day[0]["qty"] += qty
-                per_day[0]["revenue"] += qty * prices.get(item, 0.0)
-                line_count += 1
-            per_day[0]["lines"] += line_count
-            if line_count > 0:
-                per_day[0]["receipts"] += 1
+        day_records = [(0, rec) for rec in records]
+    receipt_lines = [extract_lines(rec) if isinstance(rec, dict) else [] for _, rec in day_records]
+
+    # Produktfilter som bitmap over kvitteringene: én OR over de treffende varene
+    included = None
+    if include_products:
+        bitmap = bitmap_from_receipts([item for item, _ in lines] for lines in receipt_lines)
+        included = bitmap.mask(bitmap.any_of(bitmap.products_containing(include_products)))
+
+    for i, ((d, rec), lines) in enumerate(zip(day_records, receipt_lines)):
+        if not isinstance(rec, dict) or (included is not None and not included[i]):
+            continue
+        row = per_day.setdefault(d, {"receipts": 0, "lines": 0, "qty": 0.0, "revenue": 0.0})
+        for item, qty in lines:
+            row["qty"] += qty
+            row["revenue"] += qty * prices.get(item, 0.0)
+        row["lines"] += len(lines)
+        if lines:
+            row["receipts"] += 1
 
     # Schedules (robust)
     sched_status, shifts, sched_diag = count_shifts_week(w)
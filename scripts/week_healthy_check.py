@@ -3,10 +3,19 @@
 # Kjør:
 #   python scripts/week_healthy_check.py 5
 #   python scripts/week_healthy_check.py 5 --base C:\sti\til\prosjektrot
+#   python scripts/week_healthy_check.py 5 --stream   (les post for post, konstant minne)
+#   python scripts/week_healthy_check.py --all        (alle uker parallelt, + health_report.json)
+#   python scripts/week_healthy_check.py 2-5 --json rapport.json
 
 from pathlib import Path
-import sys, json
+import sys, json, os
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from itertools import chain
+from price_timeline import build_price_timeline
+from record_layout import RecordNormalizer, extract_record, normalize_records
+from transaction_stream import iter_transactions
 
 # ===== FINN DATAMAPPEN (prosjektroten) =====
 HERE = Path(__file__).resolve()
@@ -27,6 +36,23 @@ if "--base" in sys.argv:
 if BASE is None:
     print("Fant ikke data-roten (må inneholde 'transactions' og 'amounts').")
     sys.exit(1)
+# Strømmet lesing av transaksjonsfila: --stream
+STREAM = "--stream" in sys.argv
+if STREAM:
+    sys.argv.remove("--stream")
+# Flere uker: --all, eller et intervall "2-5" som uke-argument
+ALL_WEEKS = "--all" in sys.argv
+if ALL_WEEKS:
+    sys.argv.remove("--all")
+# JSON-rapport: --json <sti> (standard health_report.json i data-roten ved flere uker)
+JSON_OUT = None
+if "--json" in sys.argv:
+    i = sys.argv.index("--json")
+    try:
+        JSON_OUT = Path(sys.argv[i + 1])
+        del sys.argv[i:i + 2]
+    except IndexError:
+        del sys.argv[i:]
 
 def jload(p: Path):
     with open(p, "r", encoding="utf-8") as f:
@@ -51,70 +77,84 @@ def pick_top_layer(data):
     return [], None
 
 def extract_lines(rec):
-    """Streng prioritet: bruk KUN første strukturen som finnes i posten."""
-    items = rec.get("items") or rec.get("products")
-    if isinstance(items, list) and items and isinstance(items[0], dict):
-        for it in items:
-            name = it.get("item") or it.get("name") or it.get("product")
-            qty  = it.get("qty") or it.get("quantity") or it.get("amount") or 1
-            if name is not None:
-                try:
-                    yield str(name), float(qty)
-                except:
-                    pass
-        return
-    mt, ma = rec.get("merch_types"), rec.get("merch_amounts")
-    if isinstance(mt, list) and isinstance(ma, list) and len(mt) == len(ma):
-        for n, q in zip(mt, ma):
-            if n is not None:
-                try:
-                    yield str(n), float(q)
-                except:
-                    pass
-        return
-    mk, ma2 = rec.get("merch_keys"), rec.get("merch_amounts")
-    if isinstance(mk, list) and isinstance(ma2, list) and len(mk) == len(ma2):
-        for n, q in zip(mk, ma2):
-            if n is not None:
-                try:
-                    yield str(n), float(q)
-                except:
-                    pass
-        return
-    merch = rec.get("merch")
-    if isinstance(merch, dict):
-        for n, q in merch.items():
-            if n is not None:
-                try:
-                    yield str(n), float(q if q is not None else 1)
-                except:
-                    pass
-        return
-    if isinstance(merch, list):
-        for n in merch:
-            if n is not None:
-                yield str(n), 1.0
+    """Streng prioritet: bruk KUN første strukturen som finnes i posten (se record_layout)."""
+    return extract_record(rec)
+
+def add_lines(row, names, amounts, prices):
+    """Legg én normalisert kvittering til dag-raden (linjer, enheter, ~omsetning, kvitteringer)."""
+    for item, qty in zip(names, amounts):
+        row["qty"] += qty
+        row["revenue"] += qty * prices.get(item, 0.0)
+    row["lines"] += len(names)
+    if names:
+        row["receipts"] += 1
+
+def empty_row():
+    return {"receipts": 0, "lines": 0, "qty": 0.0, "revenue": 0.0}
+
+def aggregate_streamed(tx_path, prices):
+    """
+    Per-dag aggregering post for post uten å laste hele uka (kun dag->liste-format).
+    Returnerer (per_day, normalizer) – normalizer har format og avviste poster.
+    """
+    per_day = {d: empty_row() for d in range(1, 8)}
+    normalizer = RecordNormalizer()
+    for d, rec in iter_transactions(tx_path):
+        row = per_day.setdefault(d, empty_row())
+        lines = normalizer.normalize(d, rec)
+        if lines is not None:
+            add_lines(row, *lines, prices)
+    return per_day, normalizer
+
+def day_table(data, prices):
+    """
+    Per-dag tabell (kvitteringer, linjer, enheter, ~omsetning) for en hel uke.
+    Postene normaliseres én gang (format oppdages per fil), linjene flates ut
+    til arrays og summeres med bincount per dag. Returnerer (per_day, normalized).
+    """
+    records, day_keys_present = pick_top_layer(data)
+    if day_keys_present:  # eksplisitte dag-lister
+        per_day = {d: empty_row() for d in range(1, 8)}
+        day_records = ((d, rec) for d in day_keys_present for rec in data[str(d)])
+    else:  # ingen dag-nøkler → legg i "0"
+        per_day = {0: empty_row()}
+        day_records = ((0, rec) for rec in records)
+
+    normalized = normalize_records(day_records)
+    counts = np.array([len(names) for names in normalized.merch_types], dtype=np.int64)
+    if not counts.sum():
+        return per_day, normalized
+
+    items = {}
+    line_item = np.array([items.setdefault(item, len(items)) for item in chain.from_iterable(normalized.merch_types)])
+    qty = np.fromiter(chain.from_iterable(normalized.merch_amounts), dtype=float, count=len(line_item))
+    price = np.array([prices.get(item, 0.0) for item in items], dtype=float)
+
+    day_keys, record_day = np.unique(np.array(normalized.day), return_inverse=True)
+    n = len(day_keys)
+    day_idx = np.repeat(record_day, counts)
+
+    lines = np.bincount(record_day, weights=counts, minlength=n)
+    units = np.bincount(day_idx, weights=qty, minlength=n)
+    revenue = np.bincount(day_idx, weights=qty * price[line_item], minlength=n)
+    # Kvitteringer med minst én linje
+    receipts = np.bincount(record_day[counts > 0], minlength=n)
+
+    for k, d in enumerate(day_keys.tolist()):
+        per_day[d] = {
+            "receipts": int(receipts[k]),
+            "lines": int(lines[k]),
+            "qty": float(units[k]),
+            "revenue": float(revenue[k]),
+        }
+    return per_day, normalized
 
 def load_prices_latest():
-    """Hent siste kjente pris per vare (for omsetningsestimat)."""
-    prices_dir = BASE / "prices"
-    latest = {}
-    if prices_dir.exists():
-        for p in sorted(prices_dir.glob("prices_*.json")):
-            try:
-                data = jload(p)
-                for k, v in data.items():
-                    try:
-                        latest[str(k)] = float(v)
-                    except:
-                        pass
-            except:
-                pass
-    sp = BASE / "supplier_prices.json"
-    if sp.exists():
-        data = jload(sp)
-        for k, v in data.items():
-            latest.setdefault(str(k), float(v) if v is not None else 0.0)
+    """Hent siste kjente pris per vare (for omsetningsestimat); uker sorteres numerisk, innkjøpspris som reserve."""
+    timeline = build_price_timeline(BASE / "prices", BASE / "supplier_prices.json")
+    latest = timeline.latest()
+    for k, v in timeline.supplier.items():
+        latest.setdefault(k, v)
     return latest
 
 # ---------- SCHEDULES (robust parser) ----------
@@ -191,85 +231,148 @@ def count_shifts_week(w):
     else:
         return "feilformat", per_day, f"uventet type: {type(data).__name__}"
 
-# ---------- MAIN ----------
-def main():
-    # uke-argument (eller spør hvis mangler)
-    if len(sys.argv) < 2:
-        try:
-            w = int(input("Hvilken uke vil du sjekke? ").strip())
-        except Exception:
-            print("Bruk: python scripts\\week_healthy_check.py <uke_index> [--base <sti_til_data>]"); return
-    else:
-        w = int(sys.argv[1])
+# ---------- RAPPORT ----------
+def health_signals(per_day, shifts):
+    """Raske signaler for én uke, som tekstlinjer."""
+    signals = []
+    days = [d for d in per_day if d != 0]
+    dead = [d for d in days if per_day[d]["receipts"] == 0 and per_day[d]["qty"] == 0]
+    if dead:
+        if any(shifts.get(d, 0) > 0 for d in dead):
+            signals.append(f"• Døddager {dead} men skift > 0 → sannsynlig POS/nett/registreringsfeil.")
+        else:
+            signals.append(f"• Døddager {dead} og skift = 0 → sannsynlig stengt/ingen bemanning.")
+    other = [k for k in per_day.keys() if k not in range(1, 8)]
+    if other and other != [0]:
+        signals.append(f"• Uvanlige dag-keys i data: {other} → sjekk dag-mapping (feil uke eller feil dager?).")
+    last3 = sum(per_day.get(d, {"qty": 0})["qty"] for d in [5, 6, 7])
+    first4 = sum(per_day.get(d, {"qty": 0})["qty"] for d in [1, 2, 3, 4])
+    if last3 > 3 * max(1.0, first4):
+        signals.append("• Salg siste 3 dager >> første 4 → sen leveranse/promo/åpningstider i starten?")
+    return signals
 
+def check_week(w, prices, stream=False):
+    """Helsesjekk for én uke som dict (samme innhold som tekstrapporten)."""
     tx_path = BASE / "transactions" / f"transactions_{w}.json"
     if not tx_path.exists():
-        print(f"Fant ikke {tx_path}")
-        return
-
-    data = jload(tx_path)
-    records, day_keys_present = pick_top_layer(data)
+        return {"week": w, "error": f"Fant ikke {tx_path}"}
 
-    # per-dag aggregering
-    per_day = {d: {"receipts": 0, "lines": 0, "qty": 0.0, "revenue": 0.0} for d in range(1, 8)}
-    prices = load_prices_latest()
+    notes = []
+    per_day = None
+    if stream:
+        try:
+            per_day, normalized = aggregate_streamed(tx_path, prices)
+        except ValueError as e:
+            notes.append(f"--stream støtter bare dag->liste-format ({e}); leser hele fila i stedet.")
+    if per_day is None:
+        per_day, normalized = day_table(jload(tx_path), prices)
 
-    if day_keys_present:  # eksplisitte dag-lister
-        for d in day_keys_present:
-            for rec in data[str(d)]:
-                if not isinstance(rec, dict): 
-                    continue
-                line_count = 0
-                for item, qty in extract_lines(rec):
-                    per_day[d]["qty"] += qty
-                    per_day[d]["revenue"] += qty * prices.get(item, 0.0)
-                    line_count += 1
-                per_day[d]["lines"] += line_count
-                if line_count > 0:
-                    per_day[d]["receipts"] += 1
-    else:  # ingen dag-nøkler → legg i "0"
-        per_day = {0: {"receipts": 0, "lines": 0, "qty": 0.0, "revenue": 0.0}}
-        for rec in records:
-            if not isinstance(rec, dict): 
-                continue
-            line_count = 0
-            for item, qty in extract_lines(rec):
-                per_day[0]["qty"] += qty
-                per_day[0]["revenue"] += qty * prices.get(item, 0.0)
-                line_count += 1
-            per_day[0]["lines"] += line_count
-            if line_count > 0:
-                per_day[0]["receipts"] += 1
-
-    # Schedules (robust)
     sched_status, shifts, sched_diag = count_shifts_week(w)
+    days = sorted(per_day)
+    return {
+        "week": w,
+        "notes": notes,
+        "days": [dict(day=d, **per_day[d], shifts=shifts.get(d, 0)) for d in days],
+        "schedules": {"status": sched_status, "diagnosis": sched_diag},
+        "records": {
+            "layout": normalized.layout,
+            "rejected": len(normalized.rejected),
+            "rejected_examples": [
+                {"position": position, "day": day, "reason": reason}
+                for position, day, reason in normalized.rejected[:20]
+            ],
+            "dropped_lines": normalized.dropped_lines,
+        },
+        "signals": health_signals(per_day, shifts),
+    }
 
-    # Utskrift
+def print_report(report):
+    for note in report.get("notes", []):
+        print(note)
+    if "error" in report:
+        print(report["error"])
+        return
+    w = report["week"]
     print(f"\nUke {w} – kvitteringer, linjer, enheter, ~omsetning, skift")
     print("{:>3}  {:>9}  {:>7}  {:>10}  {:>12}  {:>7}".format("dag", "kvitt.", "linjer", "enheter", "omsetn.(~)", "skift"))
     print("-"*3, "-"*9, "-"*7, "-"*10, "-"*12, "-"*7)
-    for d in sorted(per_day.keys()):
-        row = per_day[d]
-        print(f"{d:>3}  {row['receipts']:>9}  {row['lines']:>7}  {row['qty']:>10.0f}  {row['revenue']:>12.0f}  {shifts.get(d, 0):>7}")
+    for row in report["days"]:
+        print(f"{row['day']:>3}  {row['receipts']:>9}  {row['lines']:>7}  {row['qty']:>10.0f}  {row['revenue']:>12.0f}  {row['shifts']:>7}")
 
     # Diagnose for schedules
-    print(f"\nSchedules: {sched_status} ({sched_diag})")
+    print(f"\nSchedules: {report['schedules']['status']} ({report['schedules']['diagnosis']})")
+
+    # Avviste poster / linjer fra normaliseringen
+    records = report["records"]
+    if records["rejected"] or records["dropped_lines"]:
+        print(f"Poster ({records['layout']}): {records['rejected']} avvist, {records['dropped_lines']} linjer forkastet")
+        for example in records["rejected_examples"][:5]:
+            print(f"  post {example['position']} (dag {example['day']}): {example['reason']}")
 
     # Raske signaler
-    days = [d for d in per_day if d != 0]
-    dead = [d for d in days if per_day[d]["receipts"] == 0 and per_day[d]["qty"] == 0]
-    if dead:
-        if any(shifts.get(d, 0) > 0 for d in dead):
-            print("• Døddager", dead, "men skift > 0 → sannsynlig POS/nett/registreringsfeil.")
+    for signal in report["signals"]:
+        print(signal)
+
+# ---------- FLERE UKER (parallelt) ----------
+_worker_prices = None
+
+def _init_worker(prices):
+    global _worker_prices
+    _worker_prices = prices
+
+def _check_in_worker(w):
+    return check_week(w, _worker_prices, STREAM)
+
+def available_week_numbers():
+    return sorted(
+        int(p.stem.split("_")[1])
+        for p in (BASE / "transactions").glob("transactions_*.json")
+        if p.stem.split("_")[1].isdigit()
+    )
+
+def check_weeks(weeks, max_workers=None):
+    """Sjekk mange uker; prisene lastes én gang og deles med alle prosessene."""
+    prices = load_prices_latest()
+    workers = min(max_workers or int(os.environ.get("DASHBOARD_WORKERS", "0")) or os.cpu_count() or 1, len(weeks))
+    if workers <= 1:
+        return [check_week(w, prices, STREAM) for w in weeks]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(prices,)) as pool:
+        return list(pool.map(_check_in_worker, weeks))
+
+def write_json(reports, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"base": str(BASE), "weeks": reports}, f, ensure_ascii=False, indent=2)
+    print(f"\nJSON-rapport skrevet til {path}")
+
+# ---------- MAIN ----------
+def main():
+    # uke-argument: én uke, et intervall "a-b", eller --all
+    if ALL_WEEKS:
+        weeks = available_week_numbers()
+    elif len(sys.argv) >= 2 and "-" in sys.argv[1].strip("-"):
+        start, end = (int(x) for x in sys.argv[1].split("-"))
+        weeks = [w for w in available_week_numbers() if start <= w <= end]
+    else:
+        if len(sys.argv) < 2:
+            try:
+                w = int(input("Hvilken uke vil du sjekke? ").strip())
+            except Exception:
+                print("Bruk: python scripts\\week_healthy_check.py <uke_index|a-b|--all> [--base <sti_til_data>] [--json <sti>]"); return
         else:
-            print("• Døddager", dead, "og skift = 0 → sannsynlig stengt/ingen bemanning.")
-    other = [k for k in per_day.keys() if k not in range(1, 8)]
-    if other and other != [0]:
-        print("• Uvanlige dag-keys i data:", other, "→ sjekk dag-mapping (feil uke eller feil dager?).")
-    last3 = sum(per_day.get(d, {"qty": 0})["qty"] for d in [5, 6, 7])
-    first4 = sum(per_day.get(d, {"qty": 0})["qty"] for d in [1, 2, 3, 4])
-    if last3 > 3 * max(1.0, first4):
-        print("• Salg siste 3 dager >> første 4 → sen leveranse/promo/åpningstider i starten?")
+            w = int(sys.argv[1])
+        report = check_week(w, load_prices_latest(), STREAM)
+        print_report(report)
+        if JSON_OUT is not None:
+            write_json([report], JSON_OUT)
+        return
+
+    if not weeks:
+        print("Fant ingen uker å sjekke.")
+        return
+    reports = check_weeks(weeks)
+    for report in reports:
+        print_report(report)
+    write_json(reports, JSON_OUT or BASE / "health_report.json")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+# week_index.py
+"""
+Prefix sums over weeks for the Total view.
+
+For every metric the index keeps P[i] = sum of the first i weeks (per product
+for units, revenue, cost and stock; totals for salary, net and sales volume),
+so the sum over any week range, a running total or a rolling window is a
+difference of two rows instead of a loop from the first week:
+    range_sum("revenue", 2, 5)        weeks 2-5, all products
+    cumulative("net")                 running total per week
+    rolling("units", 4, "Cola")       4-week rolling sum for one product
+Units, revenue and cost come from the ledger; stock comes straight from every
+amounts file, so a week without a prices or transactions file still has its
+stock. Sales volume is customer-sale units on days 1-7, read from the WeekLines
+the ledger pass left in the transaction cache. The index is rebuilt when any
+input file changes.
+"""
+import threading
+import numpy as np
+from dataset import TRANSACTIONS_DIR, dataset_version, weekly_file
+from file_cache import load_json
+from ledger import get_ledger
+from transaction_stream import stream_day_totals
+from week_executor import map_weeks
+
+PRODUCT_METRICS = ("units", "revenue", "cost", "stock")
+TOTAL_METRICS = ("salary", "net", "sales_volume")
+
+_lock = threading.Lock()
+_indexes = {}  # streaming flag -> (version, WeekIndex)
+
+
+def week_sales_units(lines) -> int:
+    """Units sold to customers on days 1-7 (also the per-week partial for map_weeks)."""
+    counted = lines.sale & (lines.day >= 1) & (lines.day <= 7)
+    return int(lines.quantity[counted].sum())
+
+
+def stream_sales_units(week_number: int) -> int:
+    """week_sales_units for one week, read record by record in constant memory."""
+    path = TRANSACTIONS_DIR / f"transactions_{week_number}.json"
+    if not path.exists():
+        return 0
+    day_totals = stream_day_totals(path, customer_sales_only=True)
+    return sum(total for day, total in day_totals.items() if day in range(1, 8))
+
+
+def week_stock(week_number: int) -> dict:
+    """product name -> stock units from amounts_<week>.json ({} if it is missing)."""
+    try:
+        return load_json(weekly_file("amounts", week_number))
+    except FileNotFoundError:
+        return {}
+
+
+def _prefix(values):
+    """Prefix sums along the week axis with a leading zero row."""
+    values = np.asarray(values, dtype=float)
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+
+class WeekIndex:
+    """
+    weeks: week numbers, ascending. prefix[metric][i]: sum of the metric over weeks[:i],
+    a vector over products for PRODUCT_METRICS and a scalar for TOTAL_METRICS.
+    total_prefix[metric][i]: the same summed over products.
+    """
+
+    def __init__(self, weeks, products, per_product, totals):
+        self.weeks = list(weeks)
+        self.products = list(products)
+        self.product_index = {name: i for i, name in enumerate(products)}
+        self._weeks = np.asarray(self.weeks)
+        self.prefix = {name: _prefix(values) for name, values in {**per_product, **totals}.items()}
+        # Product metrics summed over products once, so all-product lookups stay O(1)
+        self.total_prefix = {
+            name: prefix.sum(axis=1) if name in per_product else prefix
+            for name, prefix in self.prefix.items()
+        }
+
+    def span(self, start_week=None, end_week=None):
+        """(i, j) so that weeks[i:j] are the indexed weeks in [start_week, end_week] (None = open)."""
+        i = 0 if start_week is None else int(np.searchsorted(self._weeks, start_week, side="left"))
+        j = len(self.weeks) if end_week is None else int(np.searchsorted(self._weeks, end_week, side="right"))
+        return i, max(i, j)
+
+    def _series(self, metric, product=None):
+        if product is None:
+            return self.total_prefix[metric]
+        p = self.product_index.get(product)
+        return self.prefix[metric][:, p] if p is not None else np.zeros(len(self.weeks) + 1)
+
+    def range_sum(self, metric, start_week=None, end_week=None, product=None) -> float:
+        """Sum of metric over the weeks in [start_week, end_week] (all products if product is None)."""
+        i, j = self.span(start_week, end_week)
+        prefix = self._series(metric, product)
+        return float(prefix[j] - prefix[i])
+
+    def product_range_sums(self, metric, start_week=None, end_week=None):
+        """Per-product sums of a product metric over [start_week, end_week]."""
+        i, j = self.span(start_week, end_week)
+        return self.prefix[metric][j] - self.prefix[metric][i]
+
+    def weekly(self, metric, start_week=None, end_week=None, product=None):
+        """Per-week values of metric for the weeks in range."""
+        i, j = self.span(start_week, end_week)
+        return np.diff(self._series(metric, product)[i:j + 1])
+
+    def cumulative(self, metric, start_week=None, end_week=None, product=None, from_start=False):
+        """
+        Running totals for the weeks in range: since the first indexed week, or
+        since start_week if from_start.
+        """
+        i, j = self.span(start_week, end_week)
+        prefix = self._series(metric, product)
+        base = prefix[i] if from_start else prefix[0]
+        return prefix[i + 1:j + 1] - base
+
+    def rolling(self, metric, window: int, start_week=None, end_week=None, product=None):
+        """Sum over the last `window` indexed weeks (fewer at the start), for the weeks in range."""
+        i, j = self.span(start_week, end_week)
+        prefix = self._series(metric, product)
+        ends = np.arange(i + 1, j + 1)
+        return prefix[ends] - prefix[np.maximum(ends - window, 0)]
+
+    def weeks_in(self, start_week=None, end_week=None):
+        i, j = self.span(start_week, end_week)
+        return self.weeks[i:j]
+
+
+def build_week_index(streaming: bool = False, max_workers=None) -> WeekIndex:
+    ledger = get_ledger(streaming, max_workers)
+    weeks = ledger.weeks
+
+    if streaming:
+        sales_volume = [stream_sales_units(w) for w in weeks]
+    else:
+        sales_volume = [units or 0 for units in map_weeks(week_sales_units, weeks, max_workers)]
+
+    # Stock for every week with an amounts file, including products the ledger never saw
+    products = {name: p for p, name in enumerate(ledger.products)}
+    week_stocks = [week_stock(w) for w in weeks]
+    for stock_data in week_stocks:
+        for name in stock_data:
+            products.setdefault(name, len(products))
+    stock = np.zeros((len(weeks), len(products)))
+    for w, stock_data in enumerate(week_stocks):
+        stock[w, [products[name] for name in stock_data]] = list(stock_data.values())
+
+    extra = ((0, 0), (0, len(products) - len(ledger.products)))
+    per_product = {
+        "units": np.pad(ledger.sold, extra),
+        "revenue": np.pad(ledger.sold * ledger.stocked * ledger.prices, extra),
+        "cost": np.pad(ledger.stock * ledger.supplier, extra),
+        "stock": stock,
+    }
+    totals = {"salary": ledger.salary, "net": ledger.net, "sales_volume": sales_volume}
+    return WeekIndex(weeks, list(products), per_product, totals)
+
+
+def get_week_index(streaming: bool = False, max_workers=None) -> WeekIndex:
+    """Return the index for the current input files, rebuilding it when any of them changes."""
+    version = dataset_version()
+    with _lock:
+        cached = _indexes.get(streaming)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = build_week_index(streaming, max_workers)
+        _indexes[streaming] = (version, index)
+        return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    index = get_week_index()
+    start = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    end = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(f"Weeks {index.weeks_in(start, end)}")
+    for metric in PRODUCT_METRICS + TOTAL_METRICS:
+        print(f"  {metric:<14} {index.range_sum(metric, start, end):>16,.2f}")
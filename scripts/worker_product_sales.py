@@ -1,8 +1,11 @@
 # worker_product_sales.py
 import json
-from collections import defaultdict
 from pathlib import Path
-import plotly.graph_objects as go
+import fast_figure as ff
+from week_aggregate import get_week_aggregate
+from product_bitmap import basket_line_mask
+from schedule_index import load_week_schedule
+from worker_registry import get_worker_registry
 
 TRANSACTIONS_DIR = Path("transactions")
 WORKERS_FILE = Path("workers/workers.jsonl")
@@ -11,148 +14,111 @@ SCHEDULES_DIR = Path("schedules")
 
 def load_workers():
     """Load worker data from JSONL file and return a dict mapping worker_id to name."""
-    workers = {}
     try:
-        with open(WORKERS_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    worker_data = json.loads(line)
-                    workers[worker_data["worker_id"]] = worker_data["name"]
-                except json.JSONDecodeError as e:
-                    print(f"Warning: Failed to parse line: {line[:50]}... Error: {e}")
-                    continue
+        return get_worker_registry(WORKERS_FILE).names_by_id()
     except FileNotFoundError:
         print(f"Warning: Workers file not found: {WORKERS_FILE}")
-    return workers
+        return {}
 
 
 def get_workers_on_schedule(week_number: int):
     """Get set of worker IDs who were on schedule for the specified week in the 'registers' department."""
-    file_schedule = SCHEDULES_DIR / f"schedules_{week_number}.json"
-    scheduled_workers = set()
-    
     try:
-        with open(file_schedule, "r") as f:
-            schedule = json.load(f)
-        
-        # Iterate through all days in the schedule
-        for day_schedule in schedule.values():
-            for shift in day_schedule:
-                # Only include workers from the "registers" department
-                if "worker_id" in shift and shift.get("department") == "registers":
-                    scheduled_workers.add(shift["worker_id"])
+        return load_week_schedule(week_number).workers_on("registers")
     except FileNotFoundError:
-        print(f"Warning: Schedule file not found: {file_schedule}")
+        print(f"Warning: Schedule file not found: {SCHEDULES_DIR / f'schedules_{week_number}.json'}")
     except json.JSONDecodeError as e:
         print(f"Warning: Failed to parse schedule file: {e}")
-    
-    return scheduled_workers
+    return set()
 
 
-def generate_worker_product_sales_figure(week_number: int, worker_id: str = None):
+def product_amounts_sold(week_number: int, worker_id: str = None, aggregate=None, basket=None, match: str = "any"):
+    """
+    product name -> units sold (products with sales only), for one worker or all.
+    basket: only count receipts containing any/all (match) of these products.
+    Raises FileNotFoundError if the week is missing.
+    """
+    if basket:
+        lines, mask = basket_line_mask(week_number, basket, match)
+        if worker_id is not None:
+            mask &= lines.worker_mask(worker_id)
+        products, sold = lines.products, lines.product_totals(mask)
+    else:
+        if aggregate is None:
+            aggregate = get_week_aggregate(week_number)
+        products, sold = aggregate.products, aggregate.worker_products(worker_id)
+    return {merch: int(sold[p]) for p, merch in enumerate(products) if sold[p] > 0}
+
+
+def basket_title(basket=None, match: str = "any") -> str:
+    """Title suffix describing a receipt filter ("" without one)."""
+    if not basket:
+        return ""
+    joined = ", ".join(basket) if match == "any" or len(basket) == 1 else " + ".join(basket)
+    return f" (receipts with {joined})"
+
+
+def generate_worker_product_sales_figure(week_number: int, worker_id: str = None, aggregate=None,
+                                         basket=None, match: str = "any"):
     """
     Returns a Plotly figure for product amounts sold by a specific worker.
     If worker_id is None, shows all workers' data combined.
+    aggregate: the week's WeekAggregate, if the caller already has it.
+    basket / match: restrict to receipts containing any or all of these products.
     """
-    file_transactions = TRANSACTIONS_DIR / f"transactions_{week_number}.json"
-
     try:
-        with open(file_transactions, "r") as f:
-            transactions = json.load(f)
+        product_amounts = product_amounts_sold(week_number, worker_id, aggregate, basket, match)
     except FileNotFoundError:
-        return go.Figure()
+        return ff.empty_figure()
 
     # Load worker names
     workers = load_workers()
 
-    # Sum up product amounts sold per worker
-    product_amounts = defaultdict(int)
-
-    for trans_list in transactions.values():
-        for transaction in trans_list:
-            # Filter by worker if specified
-            if worker_id is not None and transaction.get("register_worker") != worker_id:
-                continue
-
-            for merch, amount in zip(
-                transaction.get("merch_types", []),
-                transaction.get("merch_amounts", [])
-            ):
-                product_amounts[merch] += amount
-
     if not product_amounts:
         # Return empty figure if no data
-        return go.Figure().update_layout(
-            title="No sales data available for selected worker",
-            template="plotly_white"
-        )
+        return ff.empty_figure(title="No sales data available for selected worker", template_name="plotly_white")
 
     # Sort by amount (descending)
     sorted_products = sorted(product_amounts.items(), key=lambda x: x[1], reverse=True)
     labels = [item[0] for item in sorted_products]
     amounts = [item[1] for item in sorted_products]
 
-    # Build Plotly figure with horizontal bar chart
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        y=labels,
-        x=amounts,
-        orientation='h',
-        marker_color="steelblue"
-    ))
-    
+    # Horizontal bar chart
     worker_name = workers.get(worker_id, "All Workers") if worker_id else "All Workers"
-    fig.update_layout(
-        title=f"Week {week_number} — Product Sales by {worker_name}",
-        yaxis_title="Product",
-        xaxis_title="Total Amount Sold",
-        template="plotly_white",
+    return ff.figure(
+        [ff.bar(
+            y=labels,
+            x=amounts,
+            orientation='h',
+            marker=dict(color="steelblue")
+        )],
+        title=f"Week {week_number} — Product Sales by {worker_name}{basket_title(basket, match)}",
+        yaxis=ff.axis("Product"),
+        xaxis=ff.axis("Total Amount Sold"),
+        template_name="plotly_white",
         height=500
     )
-    
-    return fig
 
 
-def generate_worker_product_pie_figure(week_number: int, worker_id: str = None):
+def generate_worker_product_pie_figure(week_number: int, worker_id: str = None, aggregate=None,
+                                       basket=None, match: str = "any"):
     """
     Returns a Plotly pie chart for product amounts sold by a specific worker.
     If worker_id is None, shows all workers' data combined.
+    aggregate: the week's WeekAggregate, if the caller already has it.
+    basket / match: restrict to receipts containing any or all of these products.
     """
-    file_transactions = TRANSACTIONS_DIR / f"transactions_{week_number}.json"
-
     try:
-        with open(file_transactions, "r") as f:
-            transactions = json.load(f)
+        product_amounts = product_amounts_sold(week_number, worker_id, aggregate, basket, match)
     except FileNotFoundError:
-        return go.Figure()
+        return ff.empty_figure()
 
     # Load worker names
     workers = load_workers()
 
-    # Sum up product amounts sold per worker
-    product_amounts = defaultdict(int)
-
-    for trans_list in transactions.values():
-        for transaction in trans_list:
-            # Filter by worker if specified
-            if worker_id is not None and transaction.get("register_worker") != worker_id:
-                continue
-
-            for merch, amount in zip(
-                transaction.get("merch_types", []),
-                transaction.get("merch_amounts", [])
-            ):
-                product_amounts[merch] += amount
-
     if not product_amounts:
         # Return empty figure if no data
-        return go.Figure().update_layout(
-            title="No sales data available for selected worker",
-            template="plotly_white"
-        )
+        return ff.empty_figure(title="No sales data available for selected worker", template_name="plotly_white")
 
     # Sort by amount (descending) and take top items for better readability
     sorted_products = sorted(product_amounts.items(), key=lambda x: x[1], reverse=True)
@@ -167,21 +133,17 @@ def generate_worker_product_pie_figure(week_number: int, worker_id: str = None):
         labels.append("Others")
         amounts.append(others_sum)
 
-    # Build Plotly figure with pie chart
-    fig = go.Figure()
-    fig.add_trace(go.Pie(
-        labels=labels,
-        values=amounts,
-        hole=0.3,
-        hoverinfo="label+percent+value",
-        textinfo="label+percent"
-    ))
-    
+    # Pie chart
     worker_name = workers.get(worker_id, "All Workers") if worker_id else "All Workers"
-    fig.update_layout(
-        title=f"Week {week_number} — Product Sales Distribution by {worker_name}",
-        template="plotly_white",
+    return ff.figure(
+        [ff.pie(
+            labels=labels,
+            values=amounts,
+            hole=0.3,
+            hoverinfo="label+percent+value",
+            textinfo="label+percent"
+        )],
+        title=f"Week {week_number} — Product Sales Distribution by {worker_name}{basket_title(basket, match)}",
+        template_name="plotly_white",
         height=500
     )
-    
-    return fig
@@ -0,0 +1,86 @@
+# worker_registry.py
+"""
+Cached registry of workers/workers.jsonl.
+
+The registry holds workers in arrays (ids, names, salaries) with an
+id -> index map, and is reloaded only when the file changes on disk.
+Lines written with a decimal comma (e.g. 5833,6282857143) are repaired.
+"""
+import json
+import re
+import numpy as np
+from dataset import WORKERS_FILE
+from file_cache import cached
+
+_DECIMAL_COMMA = re.compile(r'(\d+),(\d+)')
+
+
+class WorkerRegistry:
+    """Workers in file order; index maps worker_id to its position in the arrays."""
+
+    def __init__(self, records):
+        self.records = records
+        self.ids = [r["worker_id"] for r in records]
+        self.index = {worker_id: i for i, worker_id in enumerate(self.ids)}
+        self.names = [r.get("name") for r in records]
+        self.salaries = np.array([float(r.get("salary") or 0.0) for r in records])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, worker_id):
+        return worker_id in self.index
+
+    def name(self, worker_id, default=None):
+        i = self.index.get(worker_id)
+        if i is None or self.names[i] is None:
+            return default
+        return self.names[i]
+
+    def salary(self, worker_id, default=0.0):
+        i = self.index.get(worker_id)
+        return default if i is None else float(self.salaries[i])
+
+    def indexes(self, worker_ids):
+        """Array of registry indexes for worker_ids (-1 for unknown workers)."""
+        return np.array([self.index.get(worker_id, -1) for worker_id in worker_ids], dtype=np.int64)
+
+    def names_by_id(self, default=None):
+        return {worker_id: self.name(worker_id, default) for worker_id in self.ids}
+
+    def salaries_by_id(self):
+        return dict(zip(self.ids, self.salaries.tolist()))
+
+    def records_by_id(self):
+        return dict(zip(self.ids, self.records))
+
+
+def parse_workers(path) -> WorkerRegistry:
+    """Parse a workers JSONL file, repairing decimal commas and skipping broken lines."""
+    records = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                # Try fixing common issues: comma as decimal separator
+                try:
+                    entry = json.loads(_DECIMAL_COMMA.sub(r'\1.\2', line))
+                    print(f"ℹ️ Fixed decimal separator in line {line_num}")
+                except json.JSONDecodeError:
+                    print(f"⚠️ Error parsing line {line_num} in {path}: {e}")
+                    start = max(0, e.pos - 50)
+                    print(f"   Context around error (char {e.pos}):")
+                    print(f"   ...{line[start:e.pos + 50]}...")
+                    continue
+            if isinstance(entry, dict) and "worker_id" in entry:
+                records[entry["worker_id"]] = entry
+    return WorkerRegistry(list(records.values()))
+
+
+def get_worker_registry(path=WORKERS_FILE) -> WorkerRegistry:
+    """Return the registry for path, re-parsing only if the file changed. Raises FileNotFoundError."""
+    return cached(path, parse_workers)